@@ -0,0 +1,147 @@
+# app/admission.py
+import asyncio
+import json
+import os
+import re
+
+from app.env import env_bool
+
+ADMISSION_CONTROL = env_bool("ADMISSION_CONTROL", True)
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# group -> (default concurrency, default queue bound); override with
+# ADMISSION_<GROUP>_LIMIT / ADMISSION_<GROUP>_QUEUE
+GROUP_DEFAULTS = {
+    "auth": (8, 64),
+    "score_writes": (16, 128),
+    "leaderboards": (8, 32),
+    "admin": (4, 16),
+}
+
+# (method, path regex, group); first match wins, unmatched requests are not limited
+ROUTE_GROUPS = [
+    ("POST", re.compile(r"^/users/(login|register)$"), "auth"),
+    ("POST", re.compile(r"^/scores/(batch)?$"), "score_writes"),
+    ("GET", re.compile(r"^/game/leaderboard$"), "leaderboards"),
+    ("GET", re.compile(r"^/scores/leaderboard/[^/]+$"), "leaderboards"),
+    ("GET", re.compile(r"^/scores/rankings/[^/]+$"), "leaderboards"),
+    (None, re.compile(r"^/admin(/|$)"), "admin"),
+    (None, re.compile(r"^/feedback/admin(/|$)"), "admin"),
+]
+
+
+class AdmissionGroup:
+    """
+    At most `limit` requests of one group run at once; up to `max_queue`
+    more wait for a slot. Anything beyond that (or waiting longer than
+    ADMISSION_QUEUE_TIMEOUT) is turned away with 503 instead of piling up
+    in the threadpool and DB pool behind everyone else.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self, timeout: float) -> bool:
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._slots.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+groups = {
+    name: AdmissionGroup(
+        name,
+        int(os.getenv(f"ADMISSION_{name.upper()}_LIMIT", limit)),
+        int(os.getenv(f"ADMISSION_{name.upper()}_QUEUE", queue)),
+    )
+    for name, (limit, queue) in GROUP_DEFAULTS.items()
+}
+
+
+def group_for(method: str, path: str) -> AdmissionGroup | None:
+    for m, pattern, name in ROUTE_GROUPS:
+        if (m is None or m == method) and pattern.match(path):
+            return groups[name]
+    return None
+
+
+def admission_stats() -> dict:
+    return {name: g.snapshot() for name, g in groups.items()}
+
+
+class AdmissionMiddleware:
+    """
+    Plain ASGI middleware (so streamed responses keep their slot until the
+    last chunk is sent). Each route group has its own slots, so e.g. a burst
+    of leaderboard polling can't use up the capacity score submissions need.
+    """
+
+    def __init__(self, app, timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.app = app
+        self.timeout = timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        group = group_for(scope["method"], scope["path"])
+        if group is None:
+            return await self.app(scope, receive, send)
+
+        if not await group.acquire(self.timeout):
+            return await _busy(send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
+
+
+async def _busy(send):
+    body = json.dumps({"detail": "Server is busy, please try again shortly"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(ADMISSION_RETRY_AFTER).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
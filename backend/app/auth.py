@@ -1,28 +1,122 @@
+import asyncio
+import multiprocessing
 import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from jose import jwt
+from functools import lru_cache
 
 SECRET_KEY = os.getenv("SECRET_KEY", "CHANGE_ME_SUPER_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
 
+# bcrypt cost factor; raising it makes existing hashes get upgraded on next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# hashing runs in this many worker processes (0 = inline, in the request thread)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# max hash/verify jobs queued or running; callers beyond this wait their turn
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(max(1, HASH_WORKERS) * 8)))
 
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    # imported on first use: with HASH_WORKERS > 0 only the worker processes need passlib
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# ----------------------------
+# Work done in the worker processes
+# ----------------------------
+def _hash(password: str) -> str:
+    return _pwd_context().hash(password)
+
+
+def _verify(plain: str, stored: str) -> tuple[bool, bool]:
+    """(matches, needs_rehash)"""
+    pwd_context = _pwd_context()
+    if pwd_context.identify(stored) is None:
+        # legacy plaintext row from before hashing was enabled
+        return secrets.compare_digest(plain.encode(), stored.encode()), True
+    ok = pwd_context.verify(plain, stored)
+    return ok, ok and pwd_context.needs_update(stored)
+
+
+# ----------------------------
+# Bounded process pool
+# ----------------------------
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn, not fork: the server process is multi-threaded
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _run(fn, *args):
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+    with _slots:
+        return _get_executor().submit(fn, *args).result()
+
+
+def shutdown_hash_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+# ----------------------------
+# Public helpers
+# ----------------------------
 def hash_password(password: str) -> str:
-    # TEMP: store plaintext
-    return password
+    return _run(_hash, password)
 
 
 def verify_password(plain: str, stored: str) -> bool:
-    # TEMP: compare plaintext
-    return plain == stored
+    return _run(_verify, plain, stored)[0]
+
+
+def verify_and_update(plain: str, stored: str) -> tuple[bool, str | None]:
+    """
+    Check a password. If it matches but the stored value is plaintext or
+    uses an outdated cost, also return a fresh hash for the caller to save.
+    """
+    ok, needs_rehash = _run(_verify, plain, stored)
+    if ok and needs_rehash:
+        return True, _run(_hash, plain)
+    return ok, None
+
+
+async def verify_and_update_async(plain: str, stored: str) -> tuple[bool, str | None]:
+    # waits in a thread so the event loop never blocks on the pool
+    return await asyncio.to_thread(verify_and_update, plain, stored)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    from jose import jwt  # deferred to keep cold starts fast
+
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def decode_token(token: str) -> dict:
+    from jose import jwt
+
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
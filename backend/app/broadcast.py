@@ -0,0 +1,182 @@
+# app/broadcast.py
+import asyncio
+import json
+import logging
+import os
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "16"))
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "1000"))
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# streams end after this long and the browser reconnects (EventSource does it
+# by itself), so open streams never hold up a graceful shutdown for longer
+SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", "300"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "2000"))
+
+
+def board_diff(old: list[dict], new: list[dict]) -> dict | None:
+    """
+    Positions whose entry changed, plus the new length. A client applies it
+    with board = board[:size]; board[rank - 1] = entry for each change.
+    """
+    changes = [
+        {"rank": i + 1, "entry": entry}
+        for i, entry in enumerate(new)
+        if i >= len(old) or old[i] != entry
+    ]
+    if not changes and len(new) == len(old):
+        return None
+    return {"size": len(new), "changes": changes}
+
+
+def _event(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscriber:
+    __slots__ = ("channel", "queue")
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+
+
+class LeaderboardBroadcaster:
+    """
+    Pushes top-slice changes to Server-Sent Events subscribers. Leaderboard
+    updates (from any thread) land in one inbox; a single task diffs each
+    channel against what was last sent, renders the event once and copies it
+    into every subscriber's bounded queue. A subscriber whose queue is full
+    is dropped (its EventSource reconnects and gets a fresh snapshot) instead
+    of holding everyone else up.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inbox: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._channels: dict[str, set[Subscriber]] = {}
+        self._last: dict[str, list[dict]] = {}
+        self.sent = 0
+        self.dropped = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._inbox = asyncio.Queue()
+        self._task = asyncio.create_task(self._fan_out())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for subscribers in self._channels.values():
+            for sub in subscribers:
+                self._close(sub)
+        self._channels.clear()
+        self._loop = None
+
+    def publish(self, channel: str, board: list[dict]):
+        """Thread-safe; called by app/leaderboard.py whenever a top slice changes."""
+        loop = self._loop
+        if loop is None or channel not in self._channels:
+            return  # nobody listening
+        loop.call_soon_threadsafe(self._inbox.put_nowait, (channel, board))
+
+    def subscribers(self) -> int:
+        return sum(len(s) for s in self._channels.values())
+
+    async def stream(self, channel: str, load_snapshot) -> StreamingResponse:
+        """
+        `load_snapshot()` (blocking; run in the threadpool) returns the current
+        board. The subscriber is registered before it runs, so a change landing
+        meanwhile is still delivered as a diff instead of falling in the gap.
+        """
+        if self._loop is None:
+            raise HTTPException(status_code=503, detail="Live updates are not available")
+        if self.subscribers() >= SSE_MAX_SUBSCRIBERS:
+            raise HTTPException(status_code=503, detail="Too many live viewers, please refresh later")
+
+        sub = Subscriber(channel)
+        self._channels.setdefault(channel, set()).add(sub)
+        try:
+            snapshot = await run_in_threadpool(load_snapshot)
+        except BaseException:
+            self._unsubscribe(sub)
+            raise
+        self._last.setdefault(channel, snapshot)
+
+        async def events():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + SSE_MAX_STREAM_SECONDS
+            try:
+                yield f"retry: {SSE_RETRY_MS}\n" + _event("snapshot", {"channel": channel, "entries": snapshot})
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        return
+                    try:
+                        message = await asyncio.wait_for(
+                            sub.queue.get(), min(SSE_KEEPALIVE_SECONDS, remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+                    if message is None:
+                        yield _event("dropped", {"channel": channel})
+                        return
+                    yield message
+            finally:
+                self._unsubscribe(sub)
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # ----------------------------
+    # internals (event loop only)
+    # ----------------------------
+    async def _fan_out(self):
+        while True:
+            channel, board = await self._inbox.get()
+            subscribers = self._channels.get(channel)
+            if not subscribers:
+                continue
+            diff = board_diff(self._last.get(channel, []), board)
+            self._last[channel] = board
+            if diff is None:
+                continue
+            message = _event("diff", {"channel": channel, **diff})
+            for sub in list(subscribers):
+                try:
+                    sub.queue.put_nowait(message)
+                    self.sent += 1
+                except asyncio.QueueFull:
+                    self.dropped += 1
+                    logger.info("dropping slow leaderboard subscriber on %s", channel)
+                    subscribers.discard(sub)
+                    self._close(sub)
+
+    def _unsubscribe(self, sub: Subscriber):
+        subscribers = self._channels.get(sub.channel)
+        if subscribers is not None:
+            subscribers.discard(sub)
+            if not subscribers:
+                del self._channels[sub.channel]
+                self._last.pop(sub.channel, None)
+
+    @staticmethod
+    def _close(sub: Subscriber):
+        # make room for the sentinel that ends the stream
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+
+broadcaster = LeaderboardBroadcaster()
@@ -0,0 +1,88 @@
+# app/catalog.py
+import threading
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+
+if TYPE_CHECKING:  # the async stack is optional (DB_MODE=async)
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Max scores per game (10 points per question)
+# Game 1: 2 questions -> 20, etc.
+GAME_MAX_SCORES = {
+    1: 60,  # My Digital Footprint
+    2: 60,  # Personal Info & Privacy
+    3: 50,  # Passwords & Passphrases
+    4: 60,  # Social Media Safety
+}
+
+
+class GameCatalog:
+    """
+    Games rarely change, so the list (plus each game's max score) is read
+    once and reused. Call invalidate() after adding or editing games in this
+    process; refresh() (run by leaderboard.refresh_forever) picks up games
+    added by another process. An empty list is never cached, so a server
+    started before `python -m app.manage seed` sees the games once they exist.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._games: list[dict] | None = None
+        self.version = 0  # bumped on invalidate() (ETag)
+
+    def all(self, db: Session) -> list[dict]:
+        games = self._games
+        if games is not None:
+            return games
+        return self._store(db.execute(self._query()).scalars().all())
+
+    async def all_async(self, db: "AsyncSession") -> list[dict]:
+        games = self._games
+        if games is not None:
+            return games
+        return self._store((await db.execute(self._query())).scalars().all())
+
+    @staticmethod
+    def _query():
+        return select(models.Game).order_by(models.Game.id.asc())
+
+    def refresh(self, db: Session):
+        games = self._to_dicts(db.execute(self._query()).scalars().all())
+        with self._lock:
+            if self._games is not None and games != self._games:
+                self._games = games or None
+                self.version += 1
+
+    @staticmethod
+    def _to_dicts(rows) -> list[dict]:
+        return [
+            {
+                "game_id": g.id,
+                "title": g.title,
+                "emoji": g.emoji,
+                "is_quiz": bool(g.is_quiz),
+                "max_score": GAME_MAX_SCORES.get(g.id, 0),
+            }
+            for g in rows
+        ]
+
+    def _store(self, rows) -> list[dict]:
+        games = self._to_dicts(rows)
+        if not games:
+            return games  # not seeded yet; look again next time
+        with self._lock:
+            if self._games is None:
+                self._games = games
+            return self._games
+
+    def invalidate(self):
+        with self._lock:
+            self._games = None
+            self.version += 1
+
+
+game_catalog = GameCatalog()
@@ -5,15 +5,67 @@ from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from app.env import env_bool
+from app.pool_stats import PoolMonitor
+from app.metrics import track_queries
+from app.slow_queries import slow_query_log
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# "sync" (default) or "async": async serves the hot routes from app/routes/async_routes.py
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+ASYNC_DB = DB_MODE == "async"
+
+
+def _async_url(url: str) -> str:
+    # same database, async driver (asyncpg / aiosqlite)
+    for prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def _pool_options(url: str) -> dict:
+    """
+    Pool settings from the environment. Keep DB_POOL_SIZE + DB_MAX_OVERFLOW
+    (times the number of workers) under the hosted Postgres connection cap.
+    """
+    options = {
+        # drop connections the server closed while idle instead of failing a request
+        "pool_pre_ping": env_bool("DB_POOL_PRE_PING", True),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    # in-memory SQLite uses a single-connection pool with no sizing
+    memory_sqlite = url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+    if not memory_sqlite:
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+    return options
+
+
+# skip schema setup / seeding / cache warm-up at boot (see app/manage.py)
+FAST_START = env_bool("FAST_START", False)
+
+engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL))
+pool_monitor = PoolMonitor(engine, "sync")
+track_queries(engine)
+slow_query_log.watch(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    # routes hand committed objects to the in-memory caches; don't re-SELECT them
+    expire_on_commit=False,
     bind=engine
 )
 
@@ -26,3 +78,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async_engine = None
+async_pool_monitor = None
+AsyncSessionLocal = None
+
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL))
+    async_pool_monitor = PoolMonitor(async_engine.sync_engine, "async")
+    track_queries(async_engine.sync_engine)
+    slow_query_log.watch(async_engine.sync_engine, explain_with=engine)
+    AsyncSessionLocal = async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=async_engine,
+    )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,14 +1,40 @@
+import os
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import JWTError
 
 from app.database import get_db
 from app import models
 from app.auth import decode_token
+from app.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The fields auth needs, cached per user id instead of the full row."""
+    id: int
+    username: str
+    is_admin: bool
+    is_blocked: bool
+    blocked_reason: str | None = None
+
+
+# Admin/account routes that change these fields call invalidate_user();
+# the TTL bounds staleness across worker processes.
+_user_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
+)
+
+
+def invalidate_user(user_id: int):
+    _user_cache.pop(user_id)
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
@@ -19,6 +45,8 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    from jose import JWTError  # deferred with the rest of jose (see app/auth.py)
+
     try:
         payload = decode_token(token)
         user_id = payload.get("sub")
@@ -27,9 +55,26 @@ def get_current_user(
     except JWTError:
         raise creds_error
 
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if not user:
-        raise creds_error
+    user_id = int(user_id)
+    user = _user_cache.get(user_id)
+    if user is None:
+        row = db.query(models.User).filter(models.User.id == user_id).first()
+        if not row:
+            raise creds_error
+        user = CurrentUser(
+            id=row.id,
+            username=row.username,
+            is_admin=bool(row.is_admin),
+            is_blocked=bool(row.is_blocked),
+            blocked_reason=row.blocked_reason,
+        )
+        _user_cache.set(user_id, user)
+
+    if user.is_blocked:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Account blocked: {user.blocked_reason or 'Contact admin'}",
+        )
     return user
 
 
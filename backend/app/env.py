@@ -0,0 +1,10 @@
+# app/env.py
+import os
+
+
+def env_bool(name: str, default: bool) -> bool:
+    # one spelling for every on/off setting: 1/true/yes/on, anything else is off
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
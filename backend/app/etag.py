@@ -0,0 +1,45 @@
+# app/etag.py
+import hashlib
+import json
+import secrets
+
+from fastapi import Request, Response
+
+# Versions live in memory, so tags from an earlier process (or another
+# worker) must never match. Only use etag_for for data that is itself served
+# from this process's memory (the leaderboard caches); anything read from the
+# DB per request gets a content_etag, which every worker agrees on.
+BOOT_ID = secrets.token_hex(4)
+
+# Clients may store the payload but must revalidate it every time
+PUBLIC_CACHE = "public, no-cache"
+PRIVATE_CACHE = "private, no-cache"
+
+
+def etag_for(*parts) -> str:
+    # read the versions *before* loading the data, so a concurrent write can
+    # only make the tag older than the payload, never newer
+    return '"' + "-".join([BOOT_ID, *map(str, parts)]) + '"'
+
+
+def content_etag(*parts, payload) -> str:
+    # hash of the response body itself: right on any worker, even after a restart
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(body.encode(), digest_size=8).hexdigest()
+    return '"' + "-".join([*map(str, parts), digest]) + '"'
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str = PUBLIC_CACHE):
+    """
+    Set ETag / Cache-Control on `response`. Returns a 304 response to send
+    instead if the client's If-None-Match already has this tag, else None.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return None
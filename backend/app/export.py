@@ -0,0 +1,54 @@
+# app/export.py
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+
+# rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(model, to_row, fields: list[str], fmt: str):
+    """
+    Yield a table as CSV or NDJSON, one chunk per batch. Rows come through a
+    server-side cursor (yield_per), so memory stays flat whatever the table
+    size. Uses its own session: the request's session is closed before the
+    body is streamed.
+    """
+    db = SessionLocal()
+    try:
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(fields)
+            yield buf.getvalue()
+
+        result = db.execute(
+            select(model).order_by(model.id.asc()).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        ).scalars()
+        for batch in result.partitions():
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                for obj in batch:
+                    row = to_row(obj)
+                    writer.writerow([_jsonable(row.get(f)) for f in fields])
+                chunk = buf.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps({f: _jsonable(v) for f, v in to_row(obj).items()}) + "\n"
+                    for obj in batch
+                )
+            yield chunk
+    finally:
+        db.close()
@@ -0,0 +1,415 @@
+# app/leaderboard.py
+import asyncio
+import logging
+import os
+import threading
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.catalog import GAME_MAX_SCORES, game_catalog
+
+if TYPE_CHECKING:  # the async stack is optional (DB_MODE=async)
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 10
+
+# how often the boards and the game catalog are re-read from the DB, picking
+# up writes made by other worker processes (0 turns it off, fine for a single worker)
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "30"))
+
+
+def max_total() -> int:
+    # a user's high_score is the sum of their best per game
+    return sum(GAME_MAX_SCORES.values())
+
+
+class ScoreHistogram:
+    """
+    Players per total score plus above[v] = players with a total above v, so
+    a rank is a single array lookup. Totals are bounded by max_total(), and a
+    player moving from a to b only touches above[a:b]. Totals outside the
+    range (negative, or over the cap) are clamped / grow the arrays.
+    """
+
+    def __init__(self, scores=(), cap: int = 0):
+        self.reset(scores, cap)
+
+    def reset(self, scores, cap: int):
+        self.cap = cap
+        scores = [max(0, s) for s in scores]
+        size = max([cap, *scores]) + 1
+        self._counts = [0] * size
+        for s in scores:
+            self._counts[s] += 1
+        self._above = [0] * size
+        running = 0
+        for v in range(size - 1, -1, -1):
+            self._above[v] = running
+            running += self._counts[v]
+        self.players = len(scores)
+
+    def add(self, score: int):
+        score = self._fit(score)
+        self._counts[score] += 1
+        for v in range(score):
+            self._above[v] += 1
+        self.players += 1
+
+    def remove(self, score: int):
+        score = max(0, score)
+        self._counts[score] -= 1
+        for v in range(score):
+            self._above[v] -= 1
+        self.players -= 1
+
+    def move(self, old: int, new: int):
+        old, new = max(0, old), self._fit(new)
+        if old == new:
+            return
+        self._counts[old] -= 1
+        self._counts[new] += 1
+        step = 1 if new > old else -1
+        for v in range(min(old, new), max(old, new)):
+            self._above[v] += step
+
+    def rank(self, score: int) -> int:
+        """1 + players with a higher total (ties share a rank)."""
+        score = max(0, score)
+        return self._above[score] + 1 if score < len(self._above) else 1
+
+    def percentile(self, score: int) -> float:
+        """Percentile rank: players below, plus half of those tied, over all players."""
+        if not self.players:
+            return 0.0
+        score = max(0, score)
+        tied = self._counts[score] if score < len(self._counts) else 0
+        below = self.players - self.rank(score) + 1 - tied
+        return round(100 * (below + tied / 2) / self.players, 1)
+
+    def _fit(self, score: int) -> int:
+        score = max(0, score)
+        if score >= len(self._counts):
+            grow = score + 1 - len(self._counts)
+            self._counts += [0] * grow
+            self._above += [0] * grow
+        return score
+
+
+class GlobalLeaderboard:
+    """
+    In-process index of users ordered by high_score (ties -> lower id first).
+    Rebuilt from the DB on startup and kept current by the routes that change
+    a user's score, name or blocked state, so reads never touch the DB. A
+    periodic rebuild (refresh_forever) picks up other workers' writes.
+    """
+
+    def __init__(self, size: int = TOP_N):
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries: dict[int, tuple[str, int]] = {}  # user_id -> (username, high_score)
+        self._order: list[tuple[int, int]] = []  # sorted (-high_score, user_id)
+        self._top: list[dict] = []
+        self.version = 0  # bumped whenever the top slice is rebuilt (ETag)
+        self.loaded = False
+        self._rebuild_lock = threading.RLock()
+        self._replay: list[tuple[int, tuple[str, int] | None]] | None = None
+        self._histogram = ScoreHistogram(cap=max_total())
+        self.on_change = None  # called with the new top slice (see app/broadcast.py)
+
+    def rebuild(self, db: Session):
+        with self._rebuild_lock:
+            with self._lock:
+                self._replay = []  # changes landing while we read, applied on top
+            rows = (
+                db.query(models.User.id, models.User.username, models.User.high_score)
+                .filter(or_(models.User.is_blocked == False, models.User.is_blocked.is_(None)))
+                .all()
+            )
+            with self._lock:
+                entries = {uid: (name, score or 0) for uid, name, score in rows}
+                for uid, entry in self._replay:
+                    if entry is None:
+                        entries.pop(uid, None)
+                    else:
+                        entries[uid] = entry
+                self._replay = None
+                self._entries = entries
+                self._order = sorted((-score, uid) for uid, (_, score) in entries.items())
+                self._histogram.reset((score for _, score in entries.values()), max_total())
+                self._refresh_top()
+                self.loaded = True
+
+    def ensure_loaded(self, db: Session):
+        # FAST_START skips the startup rebuild; the first read does it instead
+        if not self.loaded:
+            with self._rebuild_lock:
+                if not self.loaded:
+                    self.rebuild(db)
+
+    def upsert(self, user_id: int, username: str, high_score: int | None):
+        high_score = high_score or 0
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((user_id, (username, high_score)))
+            previous = self._entries.get(user_id)
+            self._discard(user_id)
+            self._entries[user_id] = (username, high_score)
+            if previous is None:
+                self._histogram.add(high_score)
+            else:
+                self._histogram.move(previous[1], high_score)
+            insort(self._order, (-high_score, user_id))
+            self._refresh_top()
+
+    def remove(self, user_id: int):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((user_id, None))
+            previous = self._entries.get(user_id)
+            if self._discard(user_id):
+                self._histogram.remove(previous[1])
+                self._refresh_top()
+
+    def top(self) -> list[dict]:
+        # the list is replaced (never mutated) on change, so no lock needed
+        return self._top
+
+    def leaders(self, limit: int) -> list[dict]:
+        # like top(), for any length (all-time rankings)
+        with self._lock:
+            return [
+                {"id": uid, "username": self._entries[uid][0], "high_score": -neg_score}
+                for neg_score, uid in self._order[:limit]
+            ]
+
+    def username(self, user_id: int) -> str | None:
+        entry = self._entries.get(user_id)
+        return entry[0] if entry else None
+
+    def standing(self, user_id: int, around: int = 5) -> dict | None:
+        """
+        A user's rank and percentile among ranked (non-blocked) players,
+        plus the `around` players directly above and below them.
+        """
+        with self._lock:
+            if self._histogram.cap != max_total():
+                # the max-score table changed; the histogram's range is stale
+                self._histogram.reset((s for _, s in self._entries.values()), max_total())
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            username, score = entry
+            i = bisect_left(self._order, (-score, user_id))
+            neighbours = [
+                {
+                    "rank": self._histogram.rank(-neg_score),
+                    "id": uid,
+                    "username": self._entries[uid][0],
+                    "high_score": -neg_score,
+                }
+                for neg_score, uid in self._order[max(0, i - around): i + around + 1]
+            ]
+            return {
+                "user_id": user_id,
+                "username": username,
+                "high_score": score,
+                "rank": self._histogram.rank(score),
+                "players": self._histogram.players,
+                "percentile": self._histogram.percentile(score),
+                "around": neighbours,
+            }
+
+    # ----------------------------
+    # internals (call with lock held)
+    # ----------------------------
+    def _discard(self, user_id: int) -> bool:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        key = (-entry[1], user_id)
+        i = bisect_left(self._order, key)
+        if i < len(self._order) and self._order[i] == key:
+            del self._order[i]
+        return True
+
+    def _refresh_top(self):
+        top = []
+        for neg_score, uid in self._order[: self.size]:
+            username, _ = self._entries[uid]
+            top.append({"id": uid, "username": username, "high_score": -neg_score})
+        if top != self._top:
+            self._top = top
+            self.version += 1
+            if self.on_change:
+                self.on_change(top)
+
+
+class GameLeaderboards:
+    """
+    Top-N (username, score) slice per game, loaded lazily from the
+    (game_id, score) index and only rewritten when a submission lands in
+    the slice. Everything below the slice can never move into it without
+    a new submission, so it does not need to be tracked.
+    """
+
+    def __init__(self, size: int = TOP_N):
+        self.size = size
+        self._lock = threading.Lock()
+        self._boards: dict[int, list[tuple[int, int, str]]] = {}  # game_id -> [(-score, user_id, username)]
+        self._payloads: dict[int, list[dict]] = {}
+        self._versions: dict[int, int] = {}
+        self.names_version = 0  # bumped on renames, which can touch any board
+        self.on_change = None  # called with (game_id, new top slice)
+
+    def top(self, db: Session, game_id: int, known: bool = False) -> list[dict]:
+        """`known=True` (the game id was checked) also caches an empty board."""
+        payload = self._payloads.get(game_id)
+        if payload is not None:
+            return payload
+        version = self.version(game_id)
+        rows = db.execute(self._query(game_id)).all()
+        return self._store(game_id, version, rows, known)
+
+    async def top_async(self, db: "AsyncSession", game_id: int, known: bool = False) -> list[dict]:
+        payload = self._payloads.get(game_id)
+        if payload is not None:
+            return payload
+        version = self.version(game_id)
+        rows = (await db.execute(self._query(game_id))).all()
+        return self._store(game_id, version, rows, known)
+
+    def record(self, game_id: int, user_id: int, username: str, best_score: int):
+        """Apply a user's (committed) best score for a game."""
+        with self._lock:
+            self._versions[game_id] = self._versions.get(game_id, 0) + 1
+            board = self._boards.get(game_id)
+            if board is None:
+                return  # not loaded yet; the next read picks it up from the DB
+
+            in_slice = any(uid == user_id for _, uid, _ in board)
+            if not in_slice and len(board) >= self.size and (-best_score, user_id) >= board[-1][:2]:
+                return  # below the slice, nothing visible changes
+
+            board = [e for e in board if e[1] != user_id]
+            insort(board, (-best_score, user_id, username))
+            board = board[: self.size]
+            self._boards[game_id] = board
+            self._publish(game_id, self._to_payload(board))
+
+    def rename(self, user_id: int, username: str):
+        with self._lock:
+            self.names_version += 1
+            for game_id, board in self._boards.items():
+                if any(uid == user_id and name != username for _, uid, name in board):
+                    board = [(s, uid, username if uid == user_id else name) for s, uid, name in board]
+                    self._boards[game_id] = board
+                    self._publish(game_id, self._to_payload(board))
+
+    def remove_user(self, user_id: int):
+        """Drop a blocked user from every loaded board (refresh() refills the slice)."""
+        with self._lock:
+            for game_id, board in list(self._boards.items()):
+                if any(uid == user_id for _, uid, _ in board):
+                    self._versions[game_id] = self._versions.get(game_id, 0) + 1
+                    board = [e for e in board if e[1] != user_id]
+                    self._boards[game_id] = board
+                    self._publish(game_id, self._to_payload(board))
+
+    def _publish(self, game_id: int, payload: list[dict]):
+        # call with lock held
+        changed = payload != self._payloads.get(game_id)
+        self._payloads[game_id] = payload
+        if changed and self.on_change:
+            self.on_change(game_id, payload)
+
+    def _query(self, game_id: int):
+        return (
+            select(models.Score.user_id, models.User.username, models.Score.score)
+            .join(models.User, models.User.id == models.Score.user_id)
+            .where(
+                models.Score.game_id == game_id,
+                or_(models.User.is_blocked == False, models.User.is_blocked.is_(None)),
+            )
+            .order_by(models.Score.score.desc(), models.Score.user_id.asc())
+            .limit(self.size)
+        )
+
+    def refresh(self, db: Session):
+        """Re-read every loaded board from the DB."""
+        for game_id in list(self._boards):
+            version = self.version(game_id)
+            rows = db.execute(self._query(game_id)).all()
+            board = [(-score, uid, name) for uid, name, score in rows]
+            with self._lock:
+                if self._versions.get(game_id, 0) != version:
+                    continue  # a write landed while we read; the next refresh checks again
+                if board != self._boards.get(game_id):
+                    self._versions[game_id] = version + 1
+                    self._boards[game_id] = board
+                    self._publish(game_id, self._to_payload(board))
+
+    def version(self, game_id: int) -> int:
+        with self._lock:
+            return self._versions.get(game_id, 0)
+
+    def _store(self, game_id: int, version: int, rows, known: bool = False) -> list[dict]:
+        board = [(-score, uid, name) for uid, name, score in rows]
+        payload = self._to_payload(board)
+        # don't cache empty boards (unknown game ids) or a slice a concurrent write already outdated
+        with self._lock:
+            if (board or known) and self._versions.get(game_id, 0) == version:
+                self._boards[game_id] = board
+                self._payloads[game_id] = payload
+        return payload
+
+    @staticmethod
+    def _to_payload(board) -> list[dict]:
+        return [{"username": name, "score": -neg_score} for neg_score, _, name in board]
+
+
+global_board = GlobalLeaderboard()
+game_boards = GameLeaderboards()
+
+
+def sync_user(user: models.User):
+    """Push a committed user's current state into the in-memory boards."""
+    # blocked users aren't in the global index, so treat their name as changed
+    renamed = global_board.username(user.id) != user.username
+    if user.is_blocked:
+        global_board.remove(user.id)
+        game_boards.remove_user(user.id)
+    else:
+        global_board.upsert(user.id, user.username, user.high_score)
+    if renamed:
+        game_boards.rename(user.id, user.username)
+
+
+async def refresh_forever(session_factory, interval: float = LEADERBOARD_REFRESH_SECONDS):
+    # routes only keep this process's boards current; with several workers
+    # the others' writes show up here within `interval`
+    if interval <= 0:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_refresh_once, session_factory)
+        except Exception:
+            logger.exception("leaderboard refresh failed")
+
+
+def _refresh_once(session_factory):
+    db = session_factory()
+    try:
+        game_catalog.refresh(db)
+        if global_board.loaded:
+            global_board.rebuild(db)
+        game_boards.refresh(db)
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+# app/login_tracker.py
+import logging
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+LOGIN_FLUSH_MS = int(os.getenv("LOGIN_FLUSH_MS", "1000"))
+
+
+class LoginRecorder:
+    """
+    Buffers the login bookkeeping columns (failed_login_attempts,
+    last_login_at, last_login_ip) so /users/login doesn't write on the
+    request path. Updates for the same user coalesce into one row, and a
+    background thread writes them with a bulk UPDATE every LOGIN_FLUSH_MS.
+
+    Failure counts are exact within this process: a pending (or in-flight)
+    value always wins over the possibly stale one just read from the DB.
+    """
+
+    def __init__(self, session_factory, flush_ms: int = LOGIN_FLUSH_MS):
+        self._session_factory = session_factory
+        self.flush_interval = flush_ms / 1000
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: dict[int, dict] = {}
+        self._inflight: dict[int, dict] = {}
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record_failure(self, user_id: int, stored_attempts: int | None):
+        with self._lock:
+            current = self._failed_attempts(user_id, stored_attempts)
+            entry = self._pending.setdefault(user_id, {"id": user_id})
+            entry["failed_login_attempts"] = current + 1
+
+    def record_success(self, user_id: int, at: datetime, ip: str | None):
+        with self._lock:
+            entry = self._pending.setdefault(user_id, {"id": user_id})
+            entry.update(failed_login_attempts=0, last_login_at=at, last_login_ip=ip)
+
+    def failed_attempts(self, user_id: int, stored_attempts: int | None) -> int:
+        """Current failure count: buffered if there is one, else the stored column."""
+        with self._lock:
+            return self._failed_attempts(user_id, stored_attempts)
+
+    def _failed_attempts(self, user_id: int, stored_attempts: int | None) -> int:
+        for buffered in (self._pending, self._inflight):
+            value = buffered.get(user_id, {}).get("failed_login_attempts")
+            if value is not None:
+                return value
+        return stored_attempts or 0
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._inflight, self._pending = self._pending, {}
+            rows = list(self._inflight.values())
+            db = self._session_factory()
+            try:
+                # executemany UPDATE users ... WHERE id = ?, grouped by column set
+                db.execute(update(models.User), rows)
+                db.commit()
+            except Exception:
+                logger.exception("login metadata flush failed for %d user(s)", len(rows))
+                with self._lock:
+                    # keep newer values; re-queue the rest for the next flush
+                    for uid, entry in self._inflight.items():
+                        self._pending[uid] = {**entry, **self._pending.get(uid, {})}
+            finally:
+                db.close()
+                with self._lock:
+                    self._inflight = {}
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="login-metadata-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
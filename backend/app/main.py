@@ -1,16 +1,32 @@
 # app/main.py
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.routing import APIRoute
 
 from app.routes import users, game, scores, feedback, account
-from app.database import engine, SessionLocal
-from app import models
-from app.routes import admin
+from app.database import SessionLocal, ASYNC_DB, FAST_START, async_engine
+from app.routes import admin, metrics
+from app.leaderboard import global_board, game_boards, refresh_forever
+from app.broadcast import broadcaster
+from app.auth import shutdown_hash_pool
+from app.pagination import NEXT_CURSOR_HEADER
+from app.stats import admin_counters
+from app.manage import init_db, seed_games
+from app.admission import ADMISSION_CONTROL, AdmissionMiddleware
+from app.metrics import MetricsMiddleware
+from app.slow_queries import slow_query_log
+from app.score_log import roll_off_forever
+from app.responses import GZIP_LEVEL, GZIP_MIN_SIZE, default_response_class
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# Schema setup and seeding cost several round trips on every boot; with
+# FAST_START=1 they are skipped and run via `python -m app.manage setup` instead
+if not FAST_START:
+    init_db()
 
-app = FastAPI(title="Cyber Safety Game API")
+app = FastAPI(title="Cyber Safety Game API", default_response_class=default_response_class())
 
 origins = [
     "http://localhost:5173",
@@ -20,45 +36,155 @@ origins = [
     "https://www.cyberquestto.com",
 ]
 
+# compress larger payloads (admin lists, exports) for clients that accept gzip
+if GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+
+# per route group concurrency limits; added before CORS so CORS wraps it
+# and the 503s it sends still carry CORS headers
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware)
+
+# per route latency / SQL statement counts for /metrics; outside admission
+# control so shed requests and queueing time are counted too
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
 @app.on_event("startup")
-def seed_games():
-    """
-    Seed 4 games that map to your module topics:
-    1. Digital Footprint
-    2. Personal Information & Privacy
-    3. Passwords & Passphrases
-    4. Social Media & Privacy Settings
-    """
+def seed():
+    if not FAST_START:
+        seed_games()
+
+
+@app.on_event("startup")
+def warm_caches():
+    # build the in-memory leaderboard and admin counters once; routes keep them current afterwards
+    if FAST_START:
+        return  # both load themselves on first use instead
     db = SessionLocal()
     try:
-        if db.query(models.Game).count() == 0:
-            games = [
-                models.Game(id=1, title="My Digital Footprint", emoji="👣"),
-                models.Game(id=2, title="Personal Info & Privacy", emoji="🧰"),
-                models.Game(id=3, title="Passwords & Passphrases", emoji="🔐"),
-                models.Game(id=4, title="Social Media Safety", emoji="📱"),
-            ]
-            db.add_all(games)
-            db.commit()
+        global_board.rebuild(db)
+        admin_counters.reconcile(db)
     finally:
         db.close()
 
 
+@app.on_event("startup")
+async def start_leaderboard_refresh():
+    app.state.leaderboard_refresh = asyncio.create_task(refresh_forever(SessionLocal))
+
+
+@app.on_event("shutdown")
+async def stop_leaderboard_refresh():
+    app.state.leaderboard_refresh.cancel()
+
+
+@app.on_event("startup")
+async def start_stats_reconciler():
+    app.state.stats_reconciler = asyncio.create_task(admin_counters.reconcile_forever(SessionLocal))
+
+
+@app.on_event("shutdown")
+async def stop_stats_reconciler():
+    app.state.stats_reconciler.cancel()
+
+
+@app.on_event("startup")
+async def start_score_log_roll_off():
+    app.state.score_log_roll_off = asyncio.create_task(roll_off_forever(SessionLocal))
+
+
+@app.on_event("shutdown")
+async def stop_score_log_roll_off():
+    app.state.score_log_roll_off.cancel()
+
+
+if ASYNC_DB:
+    from app.routes import async_routes
+
+    # serve the async twins of the hot routes in place of the sync ones
+    replaced = {(r.path, m) for r in async_routes.router.routes for m in r.methods}
+    for router in (users.router, game.router, scores.router):
+        router.routes = [
+            r for r in router.routes
+            if not (isinstance(r, APIRoute) and any((r.path, m) in replaced for m in r.methods))
+        ]
+
+@app.on_event("shutdown")
+def stop_hash_pool():
+    shutdown_hash_pool()
+
+
+@app.on_event("startup")
+def start_feedback_writer():
+    if feedback.FEEDBACK_WRITE_BEHIND:
+        feedback.feedback_writer.start()
+
+
+@app.on_event("shutdown")
+def drain_feedback_writer():
+    # flush queued feedback before the process exits
+    feedback.feedback_writer.stop()
+
+
+@app.on_event("startup")
+async def start_broadcaster():
+    # live leaderboard pushes (SSE); the boards report top-slice changes here
+    await broadcaster.start()
+    global_board.on_change = lambda top: broadcaster.publish("global", top)
+    game_boards.on_change = lambda game_id, top: broadcaster.publish(f"game:{game_id}", top)
+
+
+@app.on_event("shutdown")
+async def stop_broadcaster():
+    global_board.on_change = None
+    game_boards.on_change = None
+    await broadcaster.stop()
+
+
+@app.on_event("startup")
+def start_slow_query_explainer():
+    slow_query_log.explainer.start()
+
+
+@app.on_event("shutdown")
+def stop_slow_query_explainer():
+    slow_query_log.explainer.stop()
+
+
+@app.on_event("startup")
+def start_login_recorder():
+    users.login_recorder.start()
+
+
+@app.on_event("shutdown")
+def drain_login_recorder():
+    users.login_recorder.stop()
+
+
 app.include_router(users.router)
 app.include_router(game.router)
 app.include_router(scores.router)
 app.include_router(admin.router)
 app.include_router(feedback.router)
 app.include_router(account.router)
+app.include_router(metrics.router)
+
+if ASYNC_DB:
+    app.include_router(async_routes.router)
+
+    @app.on_event("shutdown")
+    async def close_async_engine():
+        await async_engine.dispose()
 
 @app.get("/")
 def root():
@@ -0,0 +1,105 @@
+# app/manage.py
+"""
+Schema + seed data setup, run at import by app/main.py unless FAST_START=1.
+With FAST_START=1, run it as a deploy step before the instance takes
+traffic (a server that is already up picks up new games on its own, but
+requests before the tables exist fail):
+
+    python -m app.manage init-db   # tables, indexes, search index, score dedupe
+    python -m app.manage seed      # the 4 games
+    python -m app.manage setup     # both
+"""
+import sys
+
+from sqlalchemy import inspect, text
+
+from app import models
+from app.catalog import game_catalog
+from app.database import engine, SessionLocal
+from app.search import ensure_feedback_search
+
+
+def dedupe_scores():
+    """
+    Older databases may hold several rows per (user_id, game_id). Fold them
+    into the best one (and re-total high_score) so the unique index can be built.
+    """
+    existing = {ix["name"] for ix in inspect(engine).get_indexes("scores")}
+    if "uq_scores_user_id_game_id" in existing:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE scores SET score = (
+                SELECT MAX(s2.score) FROM scores s2
+                WHERE s2.user_id = scores.user_id AND s2.game_id = scores.game_id
+            )
+        """))
+        conn.execute(text("""
+            DELETE FROM scores WHERE id NOT IN (
+                SELECT MIN(id) FROM scores GROUP BY user_id, game_id
+            )
+        """))
+        conn.execute(text("""
+            UPDATE users SET high_score = COALESCE(
+                (SELECT SUM(score) FROM scores WHERE scores.user_id = users.id), 0
+            )
+        """))
+
+
+def init_db():
+    # Create tables
+    models.Base.metadata.create_all(bind=engine)
+
+    dedupe_scores()
+
+    # create_all skips tables that already exist, so add any new indexes separately
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    ensure_feedback_search(engine)
+
+
+def seed_games():
+    """
+    Seed 4 games that map to your module topics:
+    1. Digital Footprint
+    2. Personal Information & Privacy
+    3. Passwords & Passphrases
+    4. Social Media & Privacy Settings
+    """
+    db = SessionLocal()
+    try:
+        if db.query(models.Game).count() == 0:
+            games = [
+                models.Game(id=1, title="My Digital Footprint", emoji="👣"),
+                models.Game(id=2, title="Personal Info & Privacy", emoji="🧰"),
+                models.Game(id=3, title="Passwords & Passphrases", emoji="🔐"),
+                models.Game(id=4, title="Social Media Safety", emoji="📱"),
+            ]
+            db.add_all(games)
+            db.commit()
+            game_catalog.invalidate()
+    finally:
+        db.close()
+
+
+COMMANDS = {
+    "init-db": [init_db],
+    "seed": [seed_games],
+    "setup": [init_db, seed_games],
+}
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 1 or argv[0] not in COMMANDS:
+        print(f"usage: python -m app.manage {{{'|'.join(COMMANDS)}}}", file=sys.stderr)
+        return 2
+    for step in COMMANDS[argv[0]]:
+        step()
+        print(f"{step.__name__}: done")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,199 @@
+# app/metrics.py
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# warn when one request runs more SQL statements than this; per-route
+# overrides as QUERY_BUDGETS="GET /scores/progress/{user_id}=2,POST /scores/=4"
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "10"))
+QUERY_BUDGETS = {
+    route.strip(): int(limit)
+    for route, _, limit in (
+        item.rpartition("=") for item in os.getenv("QUERY_BUDGETS", "").split(",") if "=" in item
+    )
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope  # the router adds "route" to it once matched
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# set per request by MetricsMiddleware; sync routes run in the threadpool
+# with a copy of the context, so they add to the same object
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_route() -> str | None:
+    """ "GET /scores/progress/{user_id}" for the request running this code, if any."""
+    stats = _current.get()
+    if stats is None:
+        return None
+    route = stats.scope.get("route")
+    return f'{stats.scope["method"]} {getattr(route, "path", stats.scope["path"])}'
+
+
+def track_queries(engine: Engine):
+    """Count statements and time spent in the DB for the current request."""
+
+    # the start time rides on the execution context, which is thrown away
+    # with it when a statement fails (after_cursor_execute never fires then)
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - context._metrics_start
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, Prometheus style."""
+
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, label_names: tuple) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            base = _labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{base}}} {series[-1]}")
+        return lines
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    def escape(v) -> str:
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{n}="{escape(v)}"' for n, v in zip(names, values))
+
+
+class RouteMetrics:
+    LABELS = ("method", "route")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Request latency by route.", LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            "http_request_db_queries", "SQL statements executed per request.", QUERY_BUCKETS
+        )
+        self.db_time = Histogram(
+            "http_request_db_seconds", "Time spent in SQL per request.", LATENCY_BUCKETS
+        )
+        self.responses: dict[tuple, int] = {}  # (method, route, status) -> count
+        self.budget_exceeded: dict[tuple, int] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        labels = (method, route)
+        with self._lock:
+            self.latency.observe(labels, seconds)
+            self.queries.observe(labels, stats.queries)
+            self.db_time.observe(labels, stats.db_seconds)
+            key = (method, route, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+        budget = QUERY_BUDGETS.get(f"{method} {route}", QUERY_BUDGET)
+        if stats.queries > budget:
+            with self._lock:
+                self.budget_exceeded[labels] = self.budget_exceeded.get(labels, 0) + 1
+            logger.warning(
+                "%s %s ran %d SQL statements (budget %d, %.1f ms in DB)",
+                method, route, stats.queries, budget, stats.db_seconds * 1000,
+            )
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for hist in (self.latency, self.queries, self.db_time):
+                lines += hist.render(self.LABELS)
+            lines += ["# HELP http_responses_total Responses by route and status.", "# TYPE http_responses_total counter"]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f"http_responses_total{{{_labels(('method', 'route', 'status'), (method, route, status))}}} {count}")
+            lines += [
+                "# HELP http_query_budget_exceeded_total Requests over their SQL statement budget.",
+                "# TYPE http_query_budget_exceeded_total counter",
+            ]
+            for labels, count in sorted(self.budget_exceeded.items()):
+                lines.append(f"http_query_budget_exceeded_total{{{_labels(self.LABELS, labels)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing each request and collecting its SQL stats.
+    Requests are labelled by route template (/scores/progress/{user_id}), so
+    series stay bounded; anything that didn't match a route is "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            route_metrics.record(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - start,
+                stats,
+            )
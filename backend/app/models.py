@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Boolean, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy import func
 from .database import Base
@@ -30,6 +30,20 @@ class User(Base):
 
     scores = relationship("Score", back_populates="user")
 
+    __table_args__ = (
+        # admin user list filters
+        Index("ix_users_is_blocked", "is_blocked"),
+        Index("ix_users_is_admin", "is_admin"),
+        Index("ix_users_age", "age"),
+        # username prefix search (LIKE 'abc%') on Postgres; elsewhere the
+        # unique username index already serves it
+        Index(
+            "ix_users_username_pattern",
+            "username",
+            postgresql_ops={"username": "varchar_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
 
 class Game(Base):
     __tablename__ = "games"
@@ -53,6 +67,13 @@ class Score(Base):
     user = relationship("User", back_populates="scores")
     game = relationship("Game", back_populates="scores")
 
+    __table_args__ = (
+        # one best-score row per user and game; also the upsert conflict target
+        Index("uq_scores_user_id_game_id", "user_id", "game_id", unique=True),
+        # per-game leaderboard: WHERE game_id = ? ORDER BY score DESC
+        Index("ix_scores_game_id_score", "game_id", "score"),
+    )
+
 class Feedback(Base):
     __tablename__ = "feedback"
 
@@ -67,3 +88,60 @@ class Feedback(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_resolved = Column(Boolean, default=False)
 
+    __table_args__ = (
+        # admin feedback list: keyset on (created_at, id) plus the common filters
+        Index("ix_feedback_created_at_id", "created_at", "id"),
+        Index("ix_feedback_topic_id_created_at", "topic_id", "created_at"),
+        Index("ix_feedback_is_resolved_created_at", "is_resolved", "created_at"),
+    )
+
+
+class ScoreEvent(Base):
+    """Every submission, append-only (Score only keeps the best per game)."""
+    __tablename__ = "score_events"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    game_id = Column(Integer, nullable=False)
+    score = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # time-range reads and cheap roll-off (DELETE ... WHERE created_at < ?)
+        Index("ix_score_events_created_at", "created_at"),
+        Index("ix_score_events_user_id_created_at", "user_id", "created_at"),
+    )
+
+
+class ScoreWindowBest(Base):
+    """Best score per user and game within one day / week (see app/score_log.py)."""
+    __tablename__ = "score_window_bests"
+
+    id = Column(Integer, primary_key=True)
+    period = Column(String(8), nullable=False)  # "day" | "week"
+    period_start = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    game_id = Column(Integer, nullable=False)
+    best = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # upsert conflict target; its (period, period_start) prefix serves roll-off
+        Index("uq_score_window_bests_key", "period", "period_start", "user_id", "game_id", unique=True),
+    )
+
+
+class ScoreWindowTotal(Base):
+    """Sum of a user's per-game bests within one day / week, kept current on submit."""
+    __tablename__ = "score_window_totals"
+
+    id = Column(Integer, primary_key=True)
+    period = Column(String(8), nullable=False)
+    period_start = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    total = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("uq_score_window_totals_key", "period", "period_start", "user_id", unique=True),
+        # ranking: WHERE period = ? AND period_start = ? ORDER BY total DESC
+        Index("ix_score_window_totals_rank", "period", "period_start", "total"),
+    )
@@ -0,0 +1,54 @@
+# app/pagination.py
+import base64
+import json
+
+from fastapi import HTTPException, Response
+from sqlalchemy import or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# List endpoints keep returning a plain JSON array; the cursor for the next
+# page (if any) travels in this header so existing clients keep working.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(list(values))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(v, int) and v >= 0 for v in values)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def paginate(rows: list, limit: int, response: Response, cursor_of) -> list:
+    """
+    `rows` was fetched with limit + 1. Trim it to the page and, if there is
+    more, set the next-page cursor from the last row using `cursor_of(row)`.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*cursor_of(rows[-1]))
+    return rows
+
+
+def like_prefix(prefix: str) -> str:
+    # escape LIKE wildcards so the prefix is matched literally (used with escape="\\")
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def flag_filter(column, value: bool):
+    # NULL counts as False for the boolean flags
+    return column.is_(True) if value else or_(column == False, column.is_(None))
@@ -0,0 +1,100 @@
+# app/pool_stats.py
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+
+class PoolMonitor:
+    """
+    Live connection pool numbers for one engine: current checked-out / idle /
+    overflow from the pool itself, plus counters from SQLAlchemy pool events
+    and the time callers spent waiting for a connection.
+    """
+
+    def __init__(self, engine: Engine, name: str, max_samples: int = 1000):
+        self.engine = engine
+        self.name = name
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=max_samples)  # seconds, most recent checkouts
+        self.counts = {
+            "connects": 0,
+            "checkouts": 0,
+            "checkins": 0,
+            "invalidated": 0,
+            "timeouts": 0,
+        }
+
+        event.listen(engine, "connect", self._count("connects"))
+        event.listen(engine, "checkout", self._count("checkouts"))
+        event.listen(engine, "checkin", self._count("checkins"))
+        event.listen(engine, "invalidate", self._count("invalidated"))
+
+        # There is no "before checkout" event, so time the pool's connect()
+        # directly. (engine.dispose() builds a new pool and drops this wrapper.)
+        pool = engine.pool
+        connect = pool.connect
+
+        def timed_connect():
+            start = time.perf_counter()
+            try:
+                return connect()
+            except PoolTimeout:
+                self._inc("timeouts")
+                raise
+            finally:
+                waited = time.perf_counter() - start
+                with self._lock:
+                    self._waits.append(waited)
+
+        pool.connect = timed_connect
+
+    def _inc(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _count(self, key: str):
+        def listener(*_):
+            self._inc(key)
+        return listener
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            counts = dict(self.counts)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3)
+
+        stats = {
+            "engine": self.name,
+            "pool": type(pool).__name__,
+            "status": pool.status(),
+            **counts,
+            "wait_ms": {
+                "samples": len(waits),
+                "avg": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "max": round(waits[-1] * 1000, 3) if waits else 0.0,
+            },
+        }
+        # QueuePool-style pools expose sizing; SQLite's singleton/static pools don't
+        for key, attr in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("idle", "checkedin"),
+            ("overflow", "overflow"),
+            ("timeout", "timeout"),
+        ):
+            fn = getattr(pool, attr, None)
+            if callable(fn):
+                stats[key] = fn()
+        stats["max_overflow"] = getattr(pool, "_max_overflow", None)
+        return stats
@@ -0,0 +1,30 @@
+# app/responses.py
+import os
+
+from fastapi.responses import JSONResponse
+
+# opt-in: JSON_RESPONSE=orjson renders every JSON response with orjson
+JSON_RESPONSE = os.getenv("JSON_RESPONSE", "json").lower()
+# responses smaller than this (bytes) aren't worth compressing; 0 turns gzip off
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+try:
+    import orjson
+except ImportError:  # optional, only needed with JSON_RESPONSE=orjson
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (handles datetimes/dates natively)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def default_response_class():
+    if JSON_RESPONSE == "orjson":
+        if orjson is None:
+            raise RuntimeError("JSON_RESPONSE=orjson needs the orjson package installed")
+        return FastJSONResponse
+    return JSONResponse
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
-from app.deps import get_current_user
+from app.deps import get_current_user, invalidate_user
 from app.schemas import AccountUpdate
+from app.auth import hash_password, verify_password
+from app.leaderboard import sync_user
 
 router = APIRouter(prefix="/account", tags=["Account"])
 
@@ -18,8 +20,8 @@ def update_account(
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # verify current password (PLAINTEXT as requested)
-    if u.password != payload.current_password:
+    # verify current password
+    if not verify_password(payload.current_password, u.password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     # username update
@@ -35,10 +37,12 @@ def update_account(
 
     # password update
     if payload.new_password:
-        u.password = payload.new_password
+        u.password = hash_password(payload.new_password)
 
     db.commit()
     db.refresh(u)
+    invalidate_user(u.id)
+    sync_user(u)
 
     return {
         "message": "Account updated successfully ✅",
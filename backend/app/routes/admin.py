@@ -1,49 +1,153 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct
 from datetime import datetime
+from typing import Literal, Optional
 
-from app.database import get_db
+from app.database import get_db, pool_monitor, async_pool_monitor
 from app import models, schemas
-from app.deps import require_admin
+from app.deps import require_admin, invalidate_user
+from app.auth import hash_password
 from app.schemas import AdminUserUpdate
+from app.leaderboard import game_boards, sync_user
+from app.stats import admin_counters
+from app.routes.scores import best_scores_by_game
+from app.routes.feedback import FeedbackOut, feedback_writer
+from app.routes.users import login_recorder
+from app.export import stream_rows
+from app.admission import admission_stats
+from app.slow_queries import slow_query_log
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate, like_prefix, flag_filter
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+USER_SUMMARY_FIELDS = [
+    "id", "username", "email", "is_admin", "age", "birthday", "is_blocked", "blocked_reason",
+]
+SCORE_FIELDS = ["id", "user_id", "game_id", "score"]
+FEEDBACK_FIELDS = list(FeedbackOut.model_fields)
+
+
+def user_summary(u: models.User) -> dict:
+    return {
+        "id": u.id,
+        "username": u.username,
+        "email": u.email,
+        "is_admin": u.is_admin,
+        "age": u.age,
+        "birthday": str(u.birthday),
+        "is_blocked": bool(getattr(u, "is_blocked", False)),
+        "blocked_reason": getattr(u, "blocked_reason", None),
+    }
+
+
 @router.get("/users")
-def list_users(db: Session = Depends(get_db), _=Depends(require_admin)):
-    users = db.query(models.User).order_by(models.User.id.asc()).all()
-    return [
-        {
-            "id": u.id,
-            "username": u.username,
-            "email": u.email,
-            "is_admin": u.is_admin,
-            "age": u.age,
-            "birthday": str(u.birthday),
-            "is_blocked": bool(getattr(u, "is_blocked", False)),
-            "blocked_reason": getattr(u, "blocked_reason", None),
-        }
-        for u in users
-    ]
+def list_users(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "asc",
+    blocked: Optional[bool] = None,
+    admin: Optional[bool] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    username_prefix: Optional[str] = Query(None, min_length=1, max_length=50),
+    db: Session = Depends(get_db),
+    _=Depends(require_admin),
+):
+    """
+    Keyset-paginated on id. Pass the X-Next-Cursor response header back as
+    `cursor` for the next page.
+    """
+    q = db.query(models.User)
+    if blocked is not None:
+        q = q.filter(flag_filter(models.User.is_blocked, blocked))
+    if admin is not None:
+        q = q.filter(flag_filter(models.User.is_admin, admin))
+    if min_age is not None:
+        q = q.filter(models.User.age >= min_age)
+    if max_age is not None:
+        q = q.filter(models.User.age <= max_age)
+    if username_prefix:
+        q = q.filter(models.User.username.like(like_prefix(username_prefix), escape="\\"))
+
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        q = q.filter(models.User.id > last_id if order == "asc" else models.User.id < last_id)
+
+    q = q.order_by(models.User.id.asc() if order == "asc" else models.User.id.desc())
+    users = paginate(q.limit(limit + 1).all(), limit, response, lambda u: (u.id,))
+    return [user_summary(u) for u in users]
+
+
+@router.get("/export/{table}")
+def export_table(
+    table: Literal["users", "scores", "feedback"],
+    format: Literal["csv", "ndjson"] = "csv",
+    _=Depends(require_admin),
+):
+    """Stream a whole table as CSV or NDJSON (same columns as the list endpoints)."""
+    if table == "users":
+        model, to_row, fields = models.User, user_summary, USER_SUMMARY_FIELDS
+    elif table == "scores":
+        model, fields = models.Score, SCORE_FIELDS
+        to_row = lambda s: {f: getattr(s, f) for f in SCORE_FIELDS}
+    else:
+        model, fields = models.Feedback, FEEDBACK_FIELDS
+        to_row = lambda fb: {f: getattr(fb, f) for f in FEEDBACK_FIELDS}
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_rows(model, to_row, fields, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
 
 
 @router.get("/stats")
 def admin_stats(db: Session = Depends(get_db), _=Depends(require_admin)):
-    total_users = db.query(func.count(models.User.id)).scalar() or 0
-    total_scores = db.query(func.count(models.Score.id)).scalar() or 0
-    players_with_scores = db.query(func.count(distinct(models.Score.user_id))).scalar() or 0
+    # running totals kept by the write routes (see app/stats.py)
+    return admin_counters.snapshot(db)
 
-    total_blocked = 0
-    if hasattr(models.User, "is_blocked"):
-        total_blocked = db.query(func.count(models.User.id)).filter(models.User.is_blocked == True).scalar() or 0
 
+@router.get("/db/pool")
+def db_pool_stats(_=Depends(require_admin)):
+    # live connection pool usage (see app/pool_stats.py)
     return {
-        "total_users": total_users,
-        "total_scores": total_scores,
-        "top_players": players_with_scores,
-        "total_blocked": total_blocked,
+        "sync": pool_monitor.snapshot(),
+        "async": async_pool_monitor.snapshot() if async_pool_monitor else None,
+    }
+
+
+@router.get("/db/slow-queries")
+def slow_queries(_=Depends(require_admin)):
+    # most recent statements over SLOW_QUERY_MS, with their plans (see app/slow_queries.py)
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "recorded": slow_query_log.recorded,
+        "entries": slow_query_log.entries(),
+    }
+
+
+@router.delete("/db/slow-queries")
+def clear_slow_queries(_=Depends(require_admin)):
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared ✅"}
+
+
+@router.get("/admission")
+def admission_control_stats(_=Depends(require_admin)):
+    # per route group concurrency, queue depth and rejections (see app/admission.py)
+    return admission_stats()
+
+
+@router.get("/write-behind")
+def write_behind_stats(_=Depends(require_admin)):
+    # background writers: queue depth, rows written, rejected (queue full) and lost after retries
+    return {
+        "feedback": feedback_writer.stats(),
+        "slow_query_explain": slow_query_log.explainer.stats(),
     }
 
 
@@ -54,18 +158,13 @@ def make_admin(user_id: int, db: Session = Depends(get_db), _=Depends(require_ad
         raise HTTPException(status_code=404, detail="User not found")
     user.is_admin = True
     db.commit()
+    invalidate_user(user.id)
     return {"message": f"{user.username} is now an admin ✅"}
 
 
 @router.get("/users/{user_id}/progress")
 def user_progress(user_id: int, db: Session = Depends(get_db), _=Depends(require_admin)):
-    rows = (
-        db.query(models.Score.game_id, func.max(models.Score.score))
-        .filter(models.Score.user_id == user_id)
-        .group_by(models.Score.game_id)
-        .all()
-    )
-    best_scores = {gid: score for gid, score in rows}
+    best_scores = best_scores_by_game(db, user_id) or {}
     return {"best_scores": best_scores}
 
 
@@ -83,12 +182,18 @@ def block_user(user_id: int, payload: dict = None, db: Session = Depends(get_db)
     if payload and isinstance(payload, dict):
         reason = payload.get("reason")
 
+    was_blocked = bool(user.is_blocked)
     user.is_blocked = True
     user.blocked_reason = reason or "Blocked by admin"
     if hasattr(user, "blocked_at"):
         user.blocked_at = datetime.utcnow()
 
     db.commit()
+    invalidate_user(user.id)
+    sync_user(user)
+    game_boards.refresh(db)  # refill the per-game slices the user dropped out of
+    if not was_blocked:
+        admin_counters.add(total_blocked=1)
     return {"message": f"{user.username} blocked ✅"}
 
 
@@ -99,12 +204,18 @@ def unblock_user(user_id: int, db: Session = Depends(get_db), _=Depends(require_
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    was_blocked = bool(user.is_blocked)
     user.is_blocked = False
     user.blocked_reason = None
     if hasattr(user, "blocked_at"):
         user.blocked_at = None
 
     db.commit()
+    invalidate_user(user.id)
+    sync_user(user)
+    game_boards.refresh(db)  # put their scores back on the per-game boards
+    if was_blocked:
+        admin_counters.add(total_blocked=-1)
     return {"message": f"{user.username} unblocked ✅"}
 
 
@@ -120,7 +231,8 @@ def suspicious_users(db: Session = Depends(get_db), _=Depends(require_admin)):
             "email": u.email,
             "is_blocked": u.is_blocked,
             "blocked_reason": u.blocked_reason,
-            "failed_login_attempts": getattr(u, "failed_login_attempts", 0),
+            # the column lags by up to LOGIN_FLUSH_MS; the recorder has the latest count
+            "failed_login_attempts": login_recorder.failed_attempts(u.id, u.failed_login_attempts),
         }
         for u in rows
     ]
@@ -154,17 +266,10 @@ def admin_create_user(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    sync_user(new_user)
+    admin_counters.add(total_users=1)
 
-    return {
-        "id": new_user.id,
-        "username": new_user.username,
-        "email": new_user.email,
-        "is_admin": new_user.is_admin,
-        "age": new_user.age,
-        "birthday": str(new_user.birthday),
-        "is_blocked": bool(getattr(new_user, "is_blocked", False)),
-        "blocked_reason": getattr(new_user, "blocked_reason", None),
-    }
+    return user_summary(new_user)
 
 @router.patch("/users/{user_id}")
 def admin_update_user(
@@ -181,10 +286,12 @@ def admin_update_user(
         user.username = payload.username.strip()
 
     if payload.password is not None and payload.password.strip():
-        user.password = payload.password  
+        user.password = hash_password(payload.password)
 
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
+    sync_user(user)
 
     return {
         "message": "User updated successfully",
@@ -0,0 +1,140 @@
+# app/routes/async_routes.py
+# Async versions of the hot routes, mounted instead of the sync ones when
+# DB_MODE=async (see app/main.py). Paths and responses match the sync routes.
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.auth import verify_and_update_async, create_access_token
+from app.catalog import game_catalog
+from app.database import get_async_db
+from app.leaderboard import global_board, game_boards, sync_user
+from app.stats import admin_counters
+from app.etag import PRIVATE_CACHE, content_etag, etag_for, not_modified
+from app.routes.users import login_recorder
+from app.score_log import record_scores_async
+from app.routes.scores import (
+    best_scores_query,
+    best_scores_from_rows,
+    build_progress,
+    leaderboard_etag,
+    sqlite_write_lock_stmt,
+    submit_lookup_query,
+    upsert_best_scores_stmt,
+)
+
+router = APIRouter()
+
+
+@router.post("/users/login", tags=["Users"])
+async def login(
+    data: schemas.UserLogin,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    user = (
+        await db.execute(select(models.User).where(models.User.email == data.email))
+    ).scalars().first()
+
+    ok, new_hash = await verify_and_update_async(data.password, user.password) if user else (False, None)
+    if not ok:
+        if user:
+            login_recorder.record_failure(user.id, user.failed_login_attempts)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if user.is_blocked:
+        raise HTTPException(status_code=403, detail=f"Account blocked: {user.blocked_reason or 'Contact admin'}")
+
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
+    login_recorder.record_success(
+        user.id,
+        datetime.utcnow(),
+        request.client.host if request.client else None,
+    )
+
+    token = create_access_token({"sub": str(user.id)})
+
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "user_id": user.id,
+        "username": user.username,
+        "is_admin": user.is_admin,
+    }
+
+
+@router.get("/game/dashboard/{user_id}", response_model=schemas.UserOut, tags=["Game"])
+async def get_user_dashboard(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.get("/game/leaderboard", tags=["Game"])
+async def get_global_leaderboard(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    if not global_board.loaded:
+        await db.run_sync(global_board.ensure_loaded)
+    cached = not_modified(request, response, etag_for("leaderboard", global_board.version))
+    if cached:
+        return cached
+    return global_board.top()
+
+
+@router.post("/scores/", tags=["Scores"])
+async def submit_score(payload: schemas.ScoreIn, db: AsyncSession = Depends(get_async_db)):
+    lock = sqlite_write_lock_stmt(db.bind.dialect.name, [payload.user_id])
+    if lock is not None:
+        await db.execute(lock)
+    row = (await db.execute(submit_lookup_query(payload.user_id, payload.game_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+    user, previous, had_scores = row
+
+    if payload.game_id not in {g["game_id"] for g in await game_catalog.all_async(db)}:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    improved = previous is None or payload.score > previous
+    if improved:
+        await db.execute(upsert_best_scores_stmt(
+            db.bind.dialect.name,
+            [{"user_id": user.id, "game_id": payload.game_id, "score": payload.score}],
+        ))
+        user.high_score = (user.high_score or 0) + payload.score - (previous or 0)
+    await record_scores_async(db, [(user.id, payload.game_id, payload.score)])
+    total_best = user.high_score or 0
+    await db.commit()
+
+    if improved:
+        sync_user(user)
+        if not user.is_blocked:
+            game_boards.record(payload.game_id, user.id, user.username, payload.score)
+    if previous is None:
+        admin_counters.add(total_scores=1, top_players=0 if had_scores else 1)
+
+    return {"message": "Score saved", "total_best": total_best}
+
+
+@router.get("/scores/leaderboard/{game_id}", tags=["Scores"])
+async def game_leaderboard(game_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    cached = not_modified(request, response, leaderboard_etag(game_id))
+    if cached:
+        return cached
+    known = game_id in {g["game_id"] for g in await game_catalog.all_async(db)}
+    return await game_boards.top_async(db, game_id, known=known)
+
+
+@router.get("/scores/progress/{user_id}", tags=["Scores"])
+async def get_user_progress(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    best_scores = best_scores_from_rows((await db.execute(best_scores_query(user_id))).all())
+    if best_scores is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    progress = build_progress(await game_catalog.all_async(db), best_scores)
+    cached = not_modified(request, response, content_etag("progress", user_id, payload=progress), PRIVATE_CACHE)
+    return cached or progress
@@ -1,15 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, or_, select, insert
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app import models
 from app.deps import get_current_user, require_admin
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate, flag_filter
+from app.env import env_bool
+from app.search import search_feedback
+from app.write_behind import BatchWriter
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
+# Optional write-behind: queue submissions and bulk insert them in the
+# background instead of one commit per request (see app/write_behind.py).
+FEEDBACK_WRITE_BEHIND = env_bool("FEEDBACK_WRITE_BEHIND", False)
+
+
+def _insert_feedback(rows: list[dict]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(models.Feedback), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+feedback_writer = BatchWriter(
+    "feedback",
+    _insert_feedback,
+    batch_size=int(os.getenv("FEEDBACK_BATCH_SIZE", "100")),
+    flush_ms=int(os.getenv("FEEDBACK_FLUSH_MS", "500")),
+    maxsize=int(os.getenv("FEEDBACK_QUEUE_SIZE", "1000")),
+)
+
 
 # ----------------------------
 # Schemas (keep here or move to app/schemas.py)
@@ -44,9 +73,24 @@ class FeedbackOut(BaseModel):
 @router.post("", status_code=status.HTTP_201_CREATED)
 def create_feedback(
     payload: FeedbackCreate,
+    response: Response,
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
+    if FEEDBACK_WRITE_BEHIND:
+        # validated already; acknowledge now and let the writer insert it
+        feedback_writer.put({
+            "user_id": user.id,
+            "topic_id": payload.topic_id,
+            "rating": payload.rating,
+            "category": payload.category,
+            "message": payload.message,
+            "screenshot_url": payload.screenshot_url,
+            "created_at": datetime.now(timezone.utc),
+        })
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Feedback submitted ✅", "id": None}
+
     fb = models.Feedback(
         user_id=user.id,
         topic_id=payload.topic_id,
@@ -84,14 +128,91 @@ def my_feedback(
 
 @router.get("/admin", response_model=List[FeedbackOut])
 def admin_list_feedback(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "desc",
+    topic_id: Optional[int] = None,
+    category: Optional[str] = Query(None, max_length=50),
+    resolved: Optional[bool] = None,
+    rating: Optional[int] = Query(None, ge=1, le=5),
     db: Session = Depends(get_db),
     _=Depends(require_admin),
 ):
-    return (
-        db.query(models.Feedback)
-        .order_by(models.Feedback.created_at.desc())
-        .all()
-    )
+    """
+    Keyset-paginated on (created_at, id), newest first by default. Pass the
+    X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    q = db.query(models.Feedback)
+    if topic_id is not None:
+        q = q.filter(models.Feedback.topic_id == topic_id)
+    if category is not None:
+        q = q.filter(models.Feedback.category == category)
+    if resolved is not None:
+        q = q.filter(flag_filter(models.Feedback.is_resolved, resolved))
+    if rating is not None:
+        q = q.filter(models.Feedback.rating == rating)
+
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        # compare against the stored created_at of the last row rather than a
+        # round-tripped timestamp, so DB-side formatting/precision can't skew it
+        last_created = (
+            select(models.Feedback.created_at)
+            .where(models.Feedback.id == last_id)
+            .scalar_subquery()
+        )
+        if order == "asc":
+            q = q.filter(or_(
+                models.Feedback.created_at > last_created,
+                and_(models.Feedback.created_at == last_created, models.Feedback.id > last_id),
+            ))
+        else:
+            q = q.filter(or_(
+                models.Feedback.created_at < last_created,
+                and_(models.Feedback.created_at == last_created, models.Feedback.id < last_id),
+            ))
+
+    if order == "asc":
+        q = q.order_by(models.Feedback.created_at.asc(), models.Feedback.id.asc())
+    else:
+        q = q.order_by(models.Feedback.created_at.desc(), models.Feedback.id.desc())
+
+    return paginate(q.limit(limit + 1).all(), limit, response, lambda f: (f.id,))
+
+
+@router.get("/admin/search", response_model=List[FeedbackOut])
+def admin_search_feedback(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    topic_id: Optional[int] = None,
+    category: Optional[str] = Query(None, max_length=50),
+    is_resolved: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    _=Depends(require_admin),
+):
+    """
+    Full-text search over feedback messages, best matches first. Results are
+    ranked, so pages are offset-based; the cursor in X-Next-Cursor encodes it.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=422, detail="Search query has no terms")
+    offset = decode_cursor(cursor, 1)[0] if cursor else 0
+
+    query = db.query(models.Feedback)
+    if topic_id is not None:
+        query = query.filter(models.Feedback.topic_id == topic_id)
+    if category is not None:
+        query = query.filter(models.Feedback.category == category)
+    if is_resolved is not None:
+        query = query.filter(flag_filter(models.Feedback.is_resolved, is_resolved))
+    query = search_feedback(query, db.get_bind().dialect.name, q)
+
+    rows = query.offset(offset).limit(limit + 1).all()
+    return paginate(rows, limit, response, lambda _: (offset + limit,))
 
 
 @router.post("/admin/{feedback_id}/resolve")
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app import models, schemas, database
+from app.leaderboard import global_board
+from app.catalog import game_catalog
+from app.etag import content_etag, etag_for, not_modified
+from app.broadcast import broadcaster
 
 router = APIRouter(prefix="/game", tags=["Game"])
 
@@ -14,24 +18,55 @@ def get_user_dashboard(user_id: int, db: Session = Depends(database.get_db)):
 
 
 @router.get("/leaderboard")
-def get_global_leaderboard(db: Session = Depends(database.get_db)):
-    users = (
-        db.query(models.User)
-        .order_by(models.User.high_score.desc())
-        .limit(10)
-        .all()
-    )
-    return [
-        {"id": u.id, "username": u.username, "high_score": u.high_score or 0}
-        for u in users
-    ]
+def get_global_leaderboard(request: Request, response: Response, db: Session = Depends(database.get_db)):
+    # served from the in-memory index (see app/leaderboard.py)
+    global_board.ensure_loaded(db)
+    cached = not_modified(request, response, etag_for("leaderboard", global_board.version))
+    if cached:
+        return cached
+    return global_board.top()
+
+
+def global_snapshot() -> list[dict]:
+    # own short-lived session: a get_db session would stay open for the whole stream
+    if not global_board.loaded:
+        db = database.SessionLocal()
+        try:
+            global_board.ensure_loaded(db)
+        finally:
+            db.close()
+    return global_board.top()
+
+
+@router.get("/leaderboard/stream")
+async def stream_global_leaderboard():
+    """
+    Server-Sent Events: a `snapshot` of the top 10, then a `diff` each time
+    the top slice changes (see app/broadcast.py).
+    """
+    return await broadcaster.stream("global", global_snapshot)
+
+
+@router.get("/rank/{user_id}")
+def get_user_rank(
+    user_id: int,
+    around: int = Query(5, ge=0, le=25),
+    db: Session = Depends(database.get_db),
+):
+    # rank / percentile come from the in-memory score histogram, no COUNT(*)
+    global_board.ensure_loaded(db)
+    standing = global_board.standing(user_id, around)
+    if standing is None:
+        raise HTTPException(status_code=404, detail="User not found or not ranked")
+    return standing
 
 
 @router.get("/list", response_model=list[schemas.GameOut])
-def list_games(db: Session = Depends(database.get_db)):
-    games = (
-        db.query(models.Game)
-        .filter(models.Game.is_quiz == True) 
-        .all()
-    )
-    return games
+def list_games(request: Request, response: Response, db: Session = Depends(database.get_db)):
+    games = [
+        {"id": g["game_id"], "title": g["title"], "emoji": g["emoji"], "is_quiz": g["is_quiz"]}
+        for g in game_catalog.all(db)
+        if g["is_quiz"]
+    ]
+    cached = not_modified(request, response, content_etag("games", payload=games))
+    return cached or games
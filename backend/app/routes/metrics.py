@@ -0,0 +1,14 @@
+# app/routes/metrics.py
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.deps import require_admin
+from app.metrics import route_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(_=Depends(require_admin)):
+    # Prometheus text format; scrape with the admin bearer token
+    return PlainTextResponse(route_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,105 +1,318 @@
 # app/routes/score.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func 
+from datetime import date, datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, tuple_, update
 from app import models, database, schemas
+from app.leaderboard import sync_user, game_boards, global_board
+from app.catalog import game_catalog
+from app.stats import admin_counters
+from app.etag import PRIVATE_CACHE, content_etag, etag_for, not_modified
+from app.broadcast import broadcaster
+from app.upsert import greatest, upsert_stmt
+from app.score_log import period_start, record_scores, window_ranking_query
 
 router = APIRouter(prefix="/scores", tags=["Scores"])
 
-# Max scores per game (10 points per question)
-# Game 1: 2 questions -> 20, etc.
-GAME_MAX_SCORES = {
-    1: 60,  # My Digital Footprint
-    2: 60,  # Personal Info & Privacy
-    3: 50,  # Passwords & Passphrases
-    4: 60,  # Social Media Safety
-}
+def best_scores_query(user_id: int):
+    # users LEFT JOIN scores so a missing user (no rows) is told apart from one with no scores
+    return (
+        select(models.User.id, models.Score.game_id, func.max(models.Score.score))
+        .outerjoin(models.Score, models.Score.user_id == models.User.id)
+        .where(models.User.id == user_id)
+        .group_by(models.User.id, models.Score.game_id)
+    )
+
+
+def best_scores_from_rows(rows) -> dict[int, int] | None:
+    if not rows:
+        return None
+    return {gid: best for _, gid, best in rows if gid is not None}
+
+
+def best_scores_by_game(db: Session, user_id: int) -> dict[int, int] | None:
+    """
+    {game_id: best_score} for one user in a single grouped query.
+    Returns None if the user does not exist.
+    """
+    return best_scores_from_rows(db.execute(best_scores_query(user_id)).all())
+
+
+def build_progress(games: list[dict], best_scores: dict[int, int]) -> list[dict]:
+    progress_list = []
+    for g in games:
+        best_score = best_scores.get(g["game_id"], 0)
+        max_score = g["max_score"]
+        percent = int(best_score / max_score * 100) if max_score > 0 else 0
+
+        progress_list.append({
+            "game_id": g["game_id"],
+            "title": g["title"],
+            "emoji": g["emoji"],
+            "best_score": best_score,
+            "max_score": max_score,
+            "percent": percent,
+        })
+    return progress_list
+
+
+def leaderboard_etag(game_id: int) -> str:
+    return etag_for("board", game_id, game_boards.version(game_id), game_boards.names_version)
+
+
+def sqlite_write_lock_stmt(dialect: str, user_ids):
+    """
+    SQLite drops FOR UPDATE and a transaction only takes the write lock at
+    its first write, so two submits could both read the same old best. A
+    no-op UPDATE of the user rows takes the lock before the lookup instead.
+    None on Postgres, where the lookup's row lock does this.
+    """
+    if dialect != "sqlite":
+        return None
+    return (
+        update(models.User)
+        .where(models.User.id.in_(list(user_ids)))
+        .values(high_score=models.User.high_score)
+    )
+
+
+def submit_lookup_query(user_id: int, game_id: int):
+    # Lock the user row and read the current best (and whether the user has
+    # any score yet) in one query. The lock serialises this user's
+    # submissions, so high_score can be moved by the delta instead of
+    # re-summing every score. On SQLite, run sqlite_write_lock_stmt first.
+    any_score = aliased(models.Score)
+    has_scores = (
+        select(any_score.id)
+        .where(any_score.user_id == models.User.id)
+        .correlate(models.User)
+        .exists()
+    )
+    return (
+        select(models.User, models.Score.score, has_scores)
+        .outerjoin(
+            models.Score,
+            (models.Score.user_id == models.User.id) & (models.Score.game_id == game_id),
+        )
+        .where(models.User.id == user_id)
+        .with_for_update(of=models.User)
+    )
+
+
+def upsert_best_scores_stmt(dialect: str, rows: list[dict]):
+    """
+    INSERT ... ON CONFLICT (user_id, game_id) DO UPDATE keeping the higher
+    score, as a single statement for any number of rows.
+    """
+    keep_higher = greatest(dialect)
+    return upsert_stmt(
+        dialect, models.Score, rows,
+        [models.Score.user_id, models.Score.game_id],
+        lambda excluded: {"score": keep_higher(models.Score.score, excluded.score)},
+    )
 
 
 @router.post("/")
 def submit_score(payload: schemas.ScoreIn, db: Session = Depends(database.get_db)):
-    user = db.query(models.User).filter(models.User.id == payload.user_id).first()
-    if not user:
+    lock = sqlite_write_lock_stmt(db.get_bind().dialect.name, [payload.user_id])
+    if lock is not None:
+        db.execute(lock)
+    row = db.execute(submit_lookup_query(payload.user_id, payload.game_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="User not found")
+    user, previous, had_scores = row
 
-    game = db.query(models.Game).filter(models.Game.id == payload.game_id).first()
-    if not game:
+    if payload.game_id not in {g["game_id"] for g in game_catalog.all(db)}:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    existing = db.query(models.Score).filter_by(
-        user_id=payload.user_id,
-        game_id=payload.game_id
-    ).first()
-
-    if existing:
-        existing.score = max(existing.score, payload.score)
-    else:
-        new_score = models.Score(
-            user_id=payload.user_id,
-            game_id=payload.game_id,
-            score=payload.score
-        )
-        db.add(new_score)
+    improved = previous is None or payload.score > previous
+    if improved:
+        db.execute(upsert_best_scores_stmt(
+            db.get_bind().dialect.name,
+            [{"user_id": user.id, "game_id": payload.game_id, "score": payload.score}],
+        ))
+        user.high_score = (user.high_score or 0) + payload.score - (previous or 0)
+    record_scores(db, [(user.id, payload.game_id, payload.score)])
+    total_best = user.high_score or 0
+    db.commit()
 
-    db.flush()  # make sure changes are visible to the aggregate
-    total_best = (
-        db.query(func.coalesce(func.sum(models.Score.score), 0))
-        .filter(models.Score.user_id == payload.user_id)
-        .scalar()
-    )
+    if improved:
+        sync_user(user)
+        if not user.is_blocked:
+            game_boards.record(payload.game_id, user.id, user.username, payload.score)
+    if previous is None:
+        admin_counters.add(total_scores=1, top_players=0 if had_scores else 1)
+
+    return {"message": "Score saved", "total_best": total_best}
+
+
+@router.post("/batch")
+def submit_scores_batch(payload: schemas.ScoreBatchIn, db: Session = Depends(database.get_db)):
+    """
+    Save many (user_id, game_id, score) results in one round trip, e.g. a
+    whole offline session. Keeps the best score per user/game like POST /scores/.
+    """
+    # collapse duplicates in the batch to the best score per user/game
+    incoming: dict[tuple[int, int], int] = {}
+    for s in payload.scores:
+        key = (s.user_id, s.game_id)
+        incoming[key] = max(incoming.get(key, s.score), s.score)
+
+    user_ids = {uid for uid, _ in incoming}
+    game_ids = {gid for _, gid in incoming}
+
+    lock = sqlite_write_lock_stmt(db.get_bind().dialect.name, user_ids)
+    if lock is not None:
+        db.execute(lock)
+    # locked in id order so concurrent batches can't deadlock
+    users = {
+        u.id: u
+        for u in db.query(models.User)
+        .filter(models.User.id.in_(user_ids))
+        .order_by(models.User.id.asc())
+        .with_for_update()
+        .all()
+    }
+    missing_users = sorted(user_ids - users.keys())
+    if missing_users:
+        raise HTTPException(status_code=404, detail=f"User not found: {missing_users}")
 
-    user.high_score = int(total_best)
+    known_games = {g["game_id"] for g in game_catalog.all(db)}
+    missing_games = sorted(game_ids - known_games)
+    if missing_games:
+        raise HTTPException(status_code=404, detail=f"Game not found: {missing_games}")
+
+    previous = {
+        (uid, gid): score
+        for uid, gid, score in db.query(models.Score.user_id, models.Score.game_id, models.Score.score)
+        .filter(tuple_(models.Score.user_id, models.Score.game_id).in_(list(incoming)))
+        .all()
+    }
+    improved = {
+        key: score
+        for key, score in incoming.items()
+        if key not in previous or score > previous[key]
+    }
+    new_rows = [key for key in incoming if key not in previous]
+    if new_rows:
+        players_with_scores = {
+            uid for (uid,) in db.query(models.Score.user_id)
+            .filter(models.Score.user_id.in_({uid for uid, _ in new_rows}))
+            .distinct()
+            .all()
+        }
+
+    if improved:
+        db.execute(upsert_best_scores_stmt(
+            db.get_bind().dialect.name,
+            [{"user_id": uid, "game_id": gid, "score": score} for (uid, gid), score in improved.items()],
+        ))
+        for (uid, gid), score in improved.items():
+            user = users[uid]
+            user.high_score = (user.high_score or 0) + score - previous.get((uid, gid), 0)
+    # every submission goes to the event log, not just the collapsed bests
+    record_scores(db, [(s.user_id, s.game_id, s.score) for s in payload.scores])
+    totals = {uid: u.high_score or 0 for uid, u in users.items()}
     db.commit()
 
-    return {"message": "Score saved", "total_best": total_best}
+    for (uid, gid), score in improved.items():
+        if not users[uid].is_blocked:
+            game_boards.record(gid, uid, users[uid].username, score)
+    for uid in {uid for uid, _ in improved}:
+        sync_user(users[uid])
+    if new_rows:
+        admin_counters.add(
+            total_scores=len(new_rows),
+            top_players=len({uid for uid, _ in new_rows} - players_with_scores),
+        )
+
+    return {
+        "message": "Scores saved",
+        "saved": len(incoming),
+        "totals": totals,
+    }
 
 
 @router.get("/leaderboard/{game_id}")
-def game_leaderboard(game_id: int, db: Session = Depends(database.get_db)):
-    results = (
-        db.query(models.User.username, models.Score.score)
-        .join(models.Score, models.User.id == models.Score.user_id)
-        .filter(models.Score.game_id == game_id)
-        .order_by(desc(models.Score.score))
-        .limit(10)
-        .all()
-    )
+def game_leaderboard(game_id: int, request: Request, response: Response, db: Session = Depends(database.get_db)):
+    cached = not_modified(request, response, leaderboard_etag(game_id))
+    if cached:
+        return cached
+    # cached top slice; only hits the (game_id, score) index on first load.
+    # Real games are cached (and refreshed) even while empty, so the version
+    # behind the ETag moves when another worker records the first score.
+    known = game_id in {g["game_id"] for g in game_catalog.all(db)}
+    return game_boards.top(db, game_id, known=known)
+
+
+def game_snapshot(game_id: int) -> list[dict]:
+    db = database.SessionLocal()
+    try:
+        if game_id not in {g["game_id"] for g in game_catalog.all(db)}:
+            raise HTTPException(status_code=404, detail="Game not found")
+        # cached even while empty, so the first score shows up as a diff
+        return game_boards.top(db, game_id, known=True)
+    finally:
+        db.close()
 
-    return [{"username": r[0], "score": r[1]} for r in results]
+
+@router.get("/leaderboard/{game_id}/stream")
+async def stream_game_leaderboard(game_id: int):
+    # same as /game/leaderboard/stream, for one game's top 10
+    return await broadcaster.stream(f"game:{game_id}", lambda: game_snapshot(game_id))
+
+
+@router.get("/rankings/{window}")
+def get_rankings(
+    window: Literal["day", "week", "all"],
+    on: date | None = Query(None, description="any date in the day/week wanted (default: today, UTC)"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(database.get_db),
+):
+    """
+    Daily, weekly or all-time leaders by sum of best scores per game. The
+    day/week totals are kept up to date on every submission (app/score_log.py),
+    so this is one index range scan; all-time comes from the in-memory board.
+    """
+    if window == "all":
+        global_board.ensure_loaded(db)
+        leaders = global_board.leaders(limit)
+        return {
+            "window": window,
+            "period_start": None,
+            "entries": [
+                {"rank": i + 1, "id": e["id"], "username": e["username"], "total": e["high_score"]}
+                for i, e in enumerate(leaders)
+            ],
+        }
+
+    start = period_start(window, on or datetime.utcnow().date())
+    rows = db.execute(window_ranking_query(window, start, limit)).all()
+    return {
+        "window": window,
+        "period_start": start.isoformat(),
+        "entries": [
+            {"rank": i + 1, "id": uid, "username": username, "total": total}
+            for i, (uid, username, total) in enumerate(rows)
+        ],
+    }
 
 
 @router.get("/progress/{user_id}")
-def get_user_progress(user_id: int, db: Session = Depends(database.get_db)):
+def get_user_progress(user_id: int, request: Request, response: Response, db: Session = Depends(database.get_db)):
     """
     Per-topic (per-game) progress for one user:
     [
       { game_id, title, emoji, best_score, max_score, percent }
     ]
     """
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
+    best_scores = best_scores_by_game(db, user_id)
+    if best_scores is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    games = db.query(models.Game).all()
-    progress_list = []
-
-    for g in games:
-        score_obj = (
-            db.query(models.Score)
-            .filter(models.Score.user_id == user_id, models.Score.game_id == g.id)
-            .first()
-        )
-        best_score = score_obj.score if score_obj else 0
-        max_score = GAME_MAX_SCORES.get(g.id, 0)
-        percent = int(best_score / max_score * 100) if max_score > 0 else 0
-
-        progress_list.append({
-            "game_id": g.id,
-            "title": g.title,
-            "emoji": g.emoji,
-            "best_score": best_score,
-            "max_score": max_score,
-            "percent": percent,
-        })
-
-    return progress_list
+    progress = build_progress(game_catalog.all(db), best_scores)
+    # tagged by content: another worker may have taken this user's last score
+    cached = not_modified(request, response, content_etag("progress", user_id, payload=progress), PRIVATE_CACHE)
+    return cached or progress
@@ -6,12 +6,19 @@ from app.database import get_db
 from app.deps import get_current_user
 
 from app import schemas, models, database
-from app.auth import hash_password, verify_password, create_access_token
+from app.auth import hash_password, verify_password, verify_and_update, create_access_token
 from datetime import datetime
 from app.schemas import ChangePasswordIn
+from app.leaderboard import sync_user
+from app.stats import admin_counters
+from app.database import SessionLocal
+from app.login_tracker import LoginRecorder
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# login bookkeeping is written in batches off the request path
+login_recorder = LoginRecorder(SessionLocal)
+
 
 @router.post("/register")
 def register(user: schemas.UserRegister, db: Session = Depends(database.get_db)):
@@ -27,7 +34,7 @@ def register(user: schemas.UserRegister, db: Session = Depends(database.get_db))
     new_user = models.User(
         username=user.username,
         email=user.email,
-        password=user.password, 
+        password=hash_password(user.password),
         birthday=user.birthday,
         age=user.age
     )
@@ -35,6 +42,8 @@ def register(user: schemas.UserRegister, db: Session = Depends(database.get_db))
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    sync_user(new_user)
+    admin_counters.add(total_users=1)
 
     return {"message": "User registered successfully"}
 
@@ -47,22 +56,28 @@ def login(
 ):
     user = db.query(models.User).filter(models.User.email == data.email).first()
 
-    if not user or not verify_password(data.password, user.password):
-        # ✅ track failed attempts if user exists
+    ok, new_hash = verify_and_update(data.password, user.password) if user else (False, None)
+    if not ok:
+        # ✅ track failed attempts if user exists (buffered, see app/login_tracker.py)
         if user:
-            user.failed_login_attempts = (user.failed_login_attempts or 0) + 1
-            db.commit()
+            login_recorder.record_failure(user.id, user.failed_login_attempts)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # ✅ if blocked, deny
     if user.is_blocked:
         raise HTTPException(status_code=403, detail=f"Account blocked: {user.blocked_reason or 'Contact admin'}")
 
-    # ✅ reset failed attempts + store login metadata
-    user.failed_login_attempts = 0
-    user.last_login_at = datetime.utcnow()
-    user.last_login_ip = request.client.host if request.client else None
-    db.commit()
+    # ✅ migrate plaintext / outdated hashes now that we know the password
+    if new_hash:
+        user.password = new_hash
+        db.commit()
+
+    # ✅ reset failed attempts + store login metadata (buffered)
+    login_recorder.record_success(
+        user.id,
+        datetime.utcnow(),
+        request.client.host if request.client else None,
+    )
 
     # ✅ real JWT token
     token = create_access_token({"sub": str(user.id)})
@@ -86,11 +101,11 @@ def change_my_password(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Validate old password
-    if db_user.password != data.current_password:
+    if not verify_password(data.current_password, db_user.password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     # Update
-    db_user.password = data.new_password
+    db_user.password = hash_password(data.new_password)
     db.commit()
 
     return {"message": "Password updated"}
\ No newline at end of file
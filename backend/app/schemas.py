@@ -64,6 +64,10 @@ class ScoreIn(BaseModel):
     score: int
 
 
+class ScoreBatchIn(BaseModel):
+    scores: List[ScoreIn] = Field(min_length=1, max_length=500)
+
+
 class ScoreEntry(BaseModel):
     username: str
     score: int
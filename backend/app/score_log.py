@@ -0,0 +1,182 @@
+# app/score_log.py
+import asyncio
+import logging
+import os
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, insert, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.upsert import greatest, upsert_stmt
+
+if TYPE_CHECKING:  # the async stack is optional (DB_MODE=async)
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("day", "week")
+
+SCORE_EVENT_RETENTION_DAYS = int(os.getenv("SCORE_EVENT_RETENTION_DAYS", "90"))
+DAY_WINDOW_RETENTION_DAYS = int(os.getenv("DAY_WINDOW_RETENTION_DAYS", "35"))
+WEEK_WINDOW_RETENTION_WEEKS = int(os.getenv("WEEK_WINDOW_RETENTION_WEEKS", "26"))
+SCORE_LOG_PRUNE_SECONDS = float(os.getenv("SCORE_LOG_PRUNE_SECONDS", "3600"))
+PRUNE_BATCH_SIZE = 5000
+
+
+def period_start(period: str, day: date) -> date:
+    # weeks start on Monday (UTC)
+    return day if period == "day" else day - timedelta(days=day.weekday())
+
+
+def current_periods(at: datetime) -> dict[str, date]:
+    return {p: period_start(p, at.date()) for p in PERIODS}
+
+
+def window_bests_query(pairs, periods: dict[str, date]):
+    """Current day/week bests for the given (user_id, game_id) pairs."""
+    W = models.ScoreWindowBest
+    return select(W.period, W.user_id, W.game_id, W.best).where(
+        or_(*(and_(W.period == p, W.period_start == start) for p, start in periods.items())),
+        tuple_(W.user_id, W.game_id).in_(list(pairs)),
+    )
+
+
+def window_update_stmts(dialect: str, best: dict[tuple[int, int], int], previous_rows, periods: dict[str, date]):
+    """
+    Statements folding new best scores into the day/week windows: raise the
+    per-game bests, and add the improvement (not a re-sum) to each user's total.
+    Callers hold the users' row locks (SQLite: the write lock), as submit_score does.
+    """
+    previous = {(p, uid, gid): b for p, uid, gid, b in previous_rows}
+    best_rows, deltas = [], {}
+    for period, start in periods.items():
+        for (uid, gid), score in best.items():
+            old = previous.get((period, uid, gid))
+            if old is not None and score <= old:
+                continue
+            best_rows.append({"period": period, "period_start": start, "user_id": uid, "game_id": gid, "best": score})
+            deltas[(period, uid)] = deltas.get((period, uid), 0) + score - (old or 0)
+    if not best_rows:
+        return []
+
+    W, T = models.ScoreWindowBest, models.ScoreWindowTotal
+    keep_higher = greatest(dialect)
+    return [
+        upsert_stmt(
+            dialect, W, best_rows,
+            [W.period, W.period_start, W.user_id, W.game_id],
+            lambda excluded: {"best": keep_higher(W.best, excluded.best)},
+        ),
+        upsert_stmt(
+            dialect, T,
+            [
+                {"period": period, "period_start": periods[period], "user_id": uid, "total": delta}
+                for (period, uid), delta in deltas.items()
+            ],
+            [T.period, T.period_start, T.user_id],
+            lambda excluded: {"total": T.total + excluded.total},
+        ),
+    ]
+
+
+def _prepare(submissions: list[tuple[int, int, int]], at: datetime | None):
+    at = at or datetime.utcnow()
+    events = [{"user_id": u, "game_id": g, "score": s, "created_at": at} for u, g, s in submissions]
+    best: dict[tuple[int, int], int] = {}
+    for u, g, s in submissions:
+        best[(u, g)] = max(best.get((u, g), s), s)
+    return events, best, current_periods(at)
+
+
+def record_scores(db: Session, submissions: list[tuple[int, int, int]], at: datetime | None = None):
+    """
+    Append (user_id, game_id, score) submissions to score_events and fold
+    them into the current day/week windows. The caller commits.
+    """
+    events, best, periods = _prepare(submissions, at)
+    db.execute(insert(models.ScoreEvent), events)
+    previous = db.execute(window_bests_query(best, periods)).all()
+    for stmt in window_update_stmts(db.get_bind().dialect.name, best, previous, periods):
+        db.execute(stmt)
+
+
+async def record_scores_async(db: "AsyncSession", submissions: list[tuple[int, int, int]], at: datetime | None = None):
+    events, best, periods = _prepare(submissions, at)
+    await db.execute(insert(models.ScoreEvent), events)
+    previous = (await db.execute(window_bests_query(best, periods))).all()
+    for stmt in window_update_stmts(db.bind.dialect.name, best, previous, periods):
+        await db.execute(stmt)
+
+
+def window_ranking_query(period: str, start: date, limit: int):
+    T = models.ScoreWindowTotal
+    return (
+        select(T.user_id, models.User.username, T.total)
+        .join(models.User, models.User.id == T.user_id)
+        .where(
+            T.period == period,
+            T.period_start == start,
+            or_(models.User.is_blocked == False, models.User.is_blocked.is_(None)),
+        )
+        .order_by(T.total.desc(), T.user_id.asc())
+        .limit(limit)
+    )
+
+
+# ----------------------------
+# Roll-off
+# ----------------------------
+def _delete_in_batches(db: Session, model, condition) -> int:
+    # short batches by primary key so roll-off never holds long locks
+    removed = 0
+    while True:
+        ids = select(model.id).where(condition).limit(PRUNE_BATCH_SIZE)
+        n = db.execute(delete(model).where(model.id.in_(ids))).rowcount
+        db.commit()
+        removed += n
+        if n < PRUNE_BATCH_SIZE:
+            return removed
+
+
+def roll_off(db: Session, now: datetime | None = None) -> dict[str, int]:
+    """Drop events and day/week windows past their retention; all range deletes on indexes."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    cutoffs = {
+        "day": today - timedelta(days=DAY_WINDOW_RETENTION_DAYS),
+        "week": period_start("week", today) - timedelta(weeks=WEEK_WINDOW_RETENTION_WEEKS),
+    }
+    removed = {
+        "score_events": _delete_in_batches(
+            db, models.ScoreEvent,
+            models.ScoreEvent.created_at < now - timedelta(days=SCORE_EVENT_RETENTION_DAYS),
+        )
+    }
+    for model in (models.ScoreWindowBest, models.ScoreWindowTotal):
+        removed[model.__tablename__] = sum(
+            _delete_in_batches(db, model, and_(model.period == p, model.period_start < cutoff))
+            for p, cutoff in cutoffs.items()
+        )
+    return removed
+
+
+async def roll_off_forever(session_factory, interval: float = SCORE_LOG_PRUNE_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await run_in_threadpool(_roll_off_once, session_factory)
+            if any(removed.values()):
+                logger.info("score log roll-off removed %s", removed)
+        except Exception:
+            logger.exception("score log roll-off failed")
+
+
+def _roll_off_once(session_factory) -> dict[str, int]:
+    db = session_factory()
+    try:
+        return roll_off(db)
+    finally:
+        db.close()
@@ -0,0 +1,80 @@
+# app/search.py
+from sqlalchemy import func, literal_column, table, column, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from app import models
+
+# Postgres text search config; must match the index expression exactly
+TS_CONFIG = literal_column("'english'")
+
+
+def ensure_feedback_search(engine: Engine):
+    """
+    Create the full-text index over feedback.message if it's missing.
+    Postgres: GIN index on to_tsvector(message), which the DB keeps current.
+    SQLite: an external-content FTS5 table kept in sync by triggers.
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_feedback_message_fts "
+                "ON feedback USING gin (to_tsvector('english', message))"
+            ))
+        elif dialect == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'feedback_fts'"
+            )).first()
+            if exists:
+                return
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE feedback_fts USING fts5("
+                "message, content='feedback', content_rowid='id')"
+            ))
+            conn.execute(text("""
+                CREATE TRIGGER feedback_fts_ai AFTER INSERT ON feedback BEGIN
+                    INSERT INTO feedback_fts(rowid, message) VALUES (new.id, new.message);
+                END
+            """))
+            conn.execute(text("""
+                CREATE TRIGGER feedback_fts_ad AFTER DELETE ON feedback BEGIN
+                    INSERT INTO feedback_fts(feedback_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                END
+            """))
+            conn.execute(text("""
+                CREATE TRIGGER feedback_fts_au AFTER UPDATE OF message ON feedback BEGIN
+                    INSERT INTO feedback_fts(feedback_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                    INSERT INTO feedback_fts(rowid, message) VALUES (new.id, new.message);
+                END
+            """))
+            # index rows written before the FTS table existed
+            conn.execute(text("INSERT INTO feedback_fts(feedback_fts) VALUES ('rebuild')"))
+
+
+def _fts5_query(q: str) -> str:
+    # quote every term so user input can't use (or break) FTS5 query syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def search_feedback(query: Query, dialect: str, q: str) -> Query:
+    """Filter a Feedback query to rows matching `q`, best matches first."""
+    if dialect == "postgresql":
+        tsv = func.to_tsvector(TS_CONFIG, models.Feedback.message)
+        tsq = func.websearch_to_tsquery(TS_CONFIG, q)
+        return (
+            query.filter(tsv.op("@@")(tsq))
+            .order_by(func.ts_rank(tsv, tsq).desc(), models.Feedback.id.desc())
+        )
+    if dialect == "sqlite":
+        fts = table("feedback_fts", column("rowid"))
+        return (
+            query.join(fts, fts.c.rowid == models.Feedback.id)
+            .filter(text("feedback_fts MATCH :fts_query").bindparams(fts_query=_fts5_query(q)))
+            .order_by(text("bm25(feedback_fts)"), models.Feedback.id.desc())
+        )
+    # no text index on other databases: plain substring match, newest first
+    return (
+        query.filter(models.Feedback.message.ilike(f"%{q}%"))
+        .order_by(models.Feedback.created_at.desc(), models.Feedback.id.desc())
+    )
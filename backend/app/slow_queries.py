@@ -0,0 +1,143 @@
+# app/slow_queries.py
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.cache import TTLCache
+from app.metrics import current_route
+from app.write_behind import BatchWriter, QueueFull
+
+logger = logging.getLogger(__name__)
+
+# statements slower than this are recorded (0 turns the log off)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|\$\d+)\s*\)")
+
+
+def normalize(statement: str) -> str:
+    # one line, literals and IN-lists of placeholders collapsed, so repeats group together
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _LITERALS.sub("?", sql)
+    return _PLACEHOLDER_LISTS.sub("(?, ...)", sql)
+
+
+def param_shape(parameters, executemany: bool):
+    """Types of the bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": param_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of the last SLOW_QUERY_LOG_SIZE statements that took longer
+    than SLOW_QUERY_MS. The query plan is captured afterwards on a separate
+    connection by a background thread, so the slow request itself doesn't
+    wait for it and its transaction is never touched.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, size: int = SLOW_QUERY_LOG_SIZE):
+        self.threshold = threshold_ms / 1000
+        self._lock = threading.Lock()
+        self._entries: deque[dict] = deque(maxlen=size)
+        self._plans = TTLCache(maxsize=256, ttl=300)  # normalized sql -> plan
+        self._explain_engine: Engine | None = None
+        self.explainer = BatchWriter(
+            "slow-query-explain", self._explain_batch,
+            batch_size=10, flush_ms=100, maxsize=100, enqueue_timeout=0,
+        )
+        self.recorded = 0
+
+    def watch(self, engine: Engine, explain_with: Engine | None = None):
+        """Record slow statements run on `engine`; plans are taken on `explain_with` (default: engine)."""
+        if self.threshold <= 0:
+            return
+        if self._explain_engine is None:
+            self._explain_engine = explain_with or engine
+
+        # on the execution context, not conn.info: failed statements never reach _after
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_start = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._slow_query_start
+            if elapsed >= self.threshold:
+                self._record(statement, parameters, executemany, elapsed, conn.dialect.paramstyle)
+
+    def _record(self, statement: str, parameters, executemany: bool, elapsed: float, paramstyle: str):
+        sql = normalize(statement)
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed * 1000, 2),
+            "route": current_route(),
+            "statement": sql,
+            "params": param_shape(parameters, executemany),
+            "plan": self._plans.get(sql),
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        logger.warning("slow query (%.1f ms) from %s: %s", elapsed * 1000, entry["route"], sql)
+
+        if entry["plan"] is not None or not sql.lower().startswith(_EXPLAINABLE):
+            return
+        if paramstyle != self._explain_engine.dialect.paramstyle:
+            # e.g. asyncpg's $1 placeholders can't be replayed through psycopg2
+            entry["plan"] = ["(not available for this driver)"]
+            return
+        first = list(parameters or [])[:1] if executemany else [parameters]
+        try:
+            self.explainer.put((entry, statement, first[0] if first else None))
+        except QueueFull:
+            pass  # explainer is backed up; this entry just goes without a plan
+
+    def _explain_batch(self, items: list):
+        dialect = self._explain_engine.dialect.name
+        prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+        with self._explain_engine.connect() as conn:
+            for entry, statement, parameters in items:
+                cached = self._plans.get(entry["statement"])
+                if cached is not None:
+                    entry["plan"] = cached
+                    continue
+                try:
+                    rows = conn.exec_driver_sql(prefix + statement, parameters or ()).all()
+                    # the plan text is the last column on both (SQLite: "detail", PG: "QUERY PLAN")
+                    plan = [str(row[-1]) for row in rows]
+                except Exception as exc:
+                    conn.rollback()
+                    plan = [f"(EXPLAIN failed: {exc.__class__.__name__})"]
+                entry["plan"] = plan
+                self._plans.set(entry["statement"], plan)
+            conn.rollback()
+
+    def entries(self) -> list[dict]:
+        # newest first
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,76 @@
+# app/stats.py
+import asyncio
+import logging
+import os
+import threading
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, distinct
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# how often the in-process counters are checked against real COUNT(*)s
+STATS_RECONCILE_SECONDS = float(os.getenv("STATS_RECONCILE_SECONDS", "300"))
+
+
+class AdminCounters:
+    """
+    Running totals behind /admin/stats. Write routes bump them after commit;
+    a periodic reconcile() resets them from the DB, which also picks up
+    writes made by other worker processes.
+    """
+
+    KEYS = ("total_users", "total_scores", "top_players", "total_blocked")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] | None = None
+
+    def reconcile(self, db: Session):
+        counts = {
+            "total_users": db.query(func.count(models.User.id)).scalar() or 0,
+            "total_scores": db.query(func.count(models.Score.id)).scalar() or 0,
+            "top_players": db.query(func.count(distinct(models.Score.user_id))).scalar() or 0,
+            "total_blocked": (
+                db.query(func.count(models.User.id))
+                .filter(models.User.is_blocked == True)
+                .scalar()
+                or 0
+            ),
+        }
+        with self._lock:
+            self._counts = counts
+
+    def add(self, **deltas: int):
+        with self._lock:
+            if self._counts is None:
+                return  # not loaded yet; the first reconcile will count it
+            for key, delta in deltas.items():
+                self._counts[key] += delta
+
+    def snapshot(self, db: Session) -> dict:
+        if self._counts is None:
+            self.reconcile(db)
+        with self._lock:
+            return dict(self._counts)
+
+    async def reconcile_forever(self, session_factory, interval: float = STATS_RECONCILE_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await run_in_threadpool(self._reconcile_once, session_factory)
+            except Exception:
+                logger.exception("admin stats reconcile failed")
+
+    def _reconcile_once(self, session_factory):
+        db = session_factory()
+        try:
+            self.reconcile(db)
+        finally:
+            db.close()
+
+
+admin_counters = AdminCounters()
@@ -0,0 +1,23 @@
+# app/upsert.py
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+def greatest(dialect: str):
+    # SQLite's two-argument max() is a scalar, like GREATEST
+    return func.greatest if dialect == "postgresql" else func.max
+
+
+def upsert_stmt(dialect: str, model, rows: list[dict], index_elements: list, set_):
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE for any number of rows,
+    as one statement. `set_(excluded)` returns the SET clause.
+    """
+    if dialect == "postgresql":
+        stmt = pg_insert(model).values(rows)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(model).values(rows)
+    else:
+        raise NotImplementedError(f"upsert not supported on {dialect}")
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_(stmt.excluded))
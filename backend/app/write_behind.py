@@ -0,0 +1,113 @@
+# app/write_behind.py
+import logging
+import queue
+import threading
+import time
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(HTTPException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class BatchWriter:
+    """
+    Bounded in-process queue drained by one background thread, which hands
+    items to `flush(items)` every `batch_size` items or `flush_ms`
+    milliseconds, whichever comes first. stop() drains what's left.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush,
+        batch_size: int = 100,
+        flush_ms: int = 500,
+        maxsize: int = 1000,
+        enqueue_timeout: float = 0.5,
+    ):
+        self.name = name
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.flushed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop accepting work, flush everything queued, then return."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def put(self, item):
+        # backpressure: wait briefly for room, then tell the client to retry
+        if self._stopping.is_set():
+            raise QueueFull()
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFull()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "queued": self._queue.qsize(),
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and not self._stopping.is_set():
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=max(remaining, 0)))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list, attempts: int = 3):
+        for attempt in range(1, attempts + 1):
+            try:
+                self._flush(batch)
+                self.flushed += len(batch)
+                return
+            except Exception:
+                logger.exception(
+                    "%s writer: flush of %d item(s) failed (attempt %d/%d)",
+                    self.name, len(batch), attempt, attempts,
+                )
+                time.sleep(0.2 * attempt)
+        # these were already acknowledged to clients; log them so they can be replayed by hand
+        self.failed += len(batch)
+        logger.error("%s writer: dropped %d item(s) after %d attempts: %r", self.name, len(batch), attempts, batch)
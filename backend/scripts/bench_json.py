@@ -0,0 +1,130 @@
+"""
+Serialization time and bytes on the wire for the big admin payloads,
+default JSONResponse vs JSON_RESPONSE=orjson, with and without gzip.
+
+    cd backend && python scripts/bench_json.py --rows 500 --repeat 50
+
+Prints one JSON document (milliseconds per response, sizes in bytes).
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.responses import GZIP_LEVEL, FastJSONResponse  # noqa: E402
+from app.routes.feedback import FeedbackOut  # noqa: E402
+from app.schemas import UserOut  # noqa: E402
+
+
+def users_payload(n: int) -> list[dict]:
+    # same shape as GET /admin/users (app.routes.admin.user_summary)
+    return [
+        {
+            "id": i,
+            "username": f"student{i}",
+            "email": f"student{i}@school.example",
+            "is_admin": False,
+            "age": 12 + i % 6,
+            "birthday": str(date(2010, 1, 1) + timedelta(days=i)),
+            "is_blocked": i % 50 == 0,
+            "blocked_reason": "Blocked by admin" if i % 50 == 0 else None,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def feedback_payload(n: int) -> list[FeedbackOut]:
+    # GET /feedback/admin returns FeedbackOut models
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    return [
+        FeedbackOut(
+            id=i,
+            user_id=i % 97 + 1,
+            topic_id=i % 4 + 1,
+            rating=i % 5 + 1,
+            category="bug" if i % 3 else "idea",
+            message="The passwords game was fun but question three was confusing. " * 2,
+            screenshot_url=None,
+            created_at=now - timedelta(minutes=i),
+            is_resolved=i % 4 == 0,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def dashboard_payload(n: int) -> list[UserOut]:
+    # GET /game/dashboard/{id}, repeated n times to get a measurable number
+    return [
+        UserOut(
+            id=i,
+            username=f"student{i}",
+            email=f"student{i}@school.example",
+            birthday=date(2010, 1, 1),
+            age=14,
+            high_score=170,
+            is_admin=False,
+            is_blocked=False,
+            failed_login_attempts=0,
+            last_login_at=datetime(2025, 1, 1, 8, 30),
+            last_login_ip="10.0.0.1",
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def timed(fn, repeat: int) -> tuple[float, bytes]:
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000, body
+
+
+def measure(payload, repeat: int) -> dict:
+    # the app runs jsonable_encoder before the response class in both modes
+    variants = {
+        "json": lambda: JSONResponse(jsonable_encoder(payload)).body,
+        "orjson": lambda: FastJSONResponse(jsonable_encoder(payload)).body,
+    }
+    out = {}
+    for name, fn in variants.items():
+        ms, body = timed(fn, repeat)
+        gz_ms, gz = timed(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), repeat)
+        out[name] = {
+            "serialize_ms": round(ms, 3),
+            "bytes": len(body),
+            "gzip_ms": round(gz_ms, 3),
+            "gzip_bytes": len(gz),
+        }
+    out["speedup"] = round(out["json"]["serialize_ms"] / out["orjson"]["serialize_ms"], 2)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="rows per payload (admin page size)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        "rows": args.rows,
+        "repeat": args.repeat,
+        "payloads": {
+            "admin_users": measure(users_payload(args.rows), args.repeat),
+            "admin_feedback": measure(feedback_payload(args.rows), args.repeat),
+            "dashboard": measure(dashboard_payload(args.rows), args.repeat),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-start cost with and without FAST_START: each trial is a fresh Python
+process that imports app.main, runs the startup hooks and serves its first
+requests. Uses DATABASE_URL as-is (the schema is set up once beforehand).
+
+    cd backend && DATABASE_URL=sqlite:////tmp/cold.db python scripts/measure_cold_start.py --trials 5
+
+Prints one JSON document with median milliseconds per phase.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    t2 = time.perf_counter()
+    assert client.get("/game/list").status_code == 200
+    t3 = time.perf_counter()
+    assert client.get("/game/leaderboard").status_code == 200
+    t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "startup_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "first_leaderboard_ms": (t4 - t3) * 1000,
+}))
+"""
+
+
+def run_trial(fast_start: bool) -> dict:
+    env = {**os.environ, "FAST_START": "1" if fast_start else "0", "PYTHONPATH": BACKEND}
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        sys.exit("set DATABASE_URL (e.g. sqlite:////tmp/cold.db)")
+
+    # schema + seed data once, like a deploy step would
+    subprocess.run(
+        [sys.executable, "-W", "ignore", "-m", "app.manage", "setup"],
+        cwd=BACKEND, env={**os.environ, "PYTHONPATH": BACKEND}, check=True, capture_output=True,
+    )
+
+    report = {"trials": args.trials}
+    for name, fast in (("default", False), ("fast_start", True)):
+        trials = [run_trial(fast) for _ in range(args.trials)]
+        report[name] = {
+            key: round(statistics.median(t[key] for t in trials), 1)
+            for key in trials[0]
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
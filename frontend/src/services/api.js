@@ -22,6 +22,37 @@ export const getUserDashboard = (userId) =>
 export const getGlobalLeaderboard = () =>
   api.get("/game/leaderboard").then((res) => res.data);
 
+export const getUserRank = (userId, around = 5) =>
+  api.get(`/game/rank/${userId}`, { params: { around } }).then((res) => res.data);
+
+// window: "day" | "week" | "all"; on: any date in the day/week (default today)
+export const getRankings = (window, { on, limit = 10 } = {}) =>
+  api.get(`/scores/rankings/${window}`, { params: { on, limit } }).then((res) => res.data);
+
+// Live leaderboard (Server-Sent Events). Calls onChange(board) with the
+// current top 10 on connect and after every change; returns an unsubscribe fn.
+export const subscribeLeaderboard = (gameId, onChange) => {
+  const path = gameId ? `/scores/leaderboard/${gameId}/stream` : "/game/leaderboard/stream";
+  const source = new EventSource(`${API_BASE_URL}${path}`);
+  let board = [];
+
+  source.addEventListener("snapshot", (e) => {
+    board = JSON.parse(e.data).entries;
+    onChange(board);
+  });
+  source.addEventListener("diff", (e) => {
+    const { size, changes } = JSON.parse(e.data);
+    board = board.slice(0, size);
+    changes.forEach(({ rank, entry }) => {
+      board[rank - 1] = entry;
+    });
+    onChange([...board]);
+  });
+  // "dropped" / stream end: EventSource reconnects and sends a fresh snapshot
+
+  return () => source.close();
+};
+
 export const getGames = () =>
   api.get("/game/list").then((res) => res.data);
 
@@ -29,6 +60,10 @@ export const getGames = () =>
 export const submitScore = (payload) =>
   api.post("/scores/", payload).then((res) => res.data);
 
+// scores: [{ user_id, game_id, score }, ...]
+export const submitScoresBatch = (scores) =>
+  api.post("/scores/batch", { scores }).then((res) => res.data);
+
 export const getGameLeaderboard = (gameId) =>
   api.get(`/scores/leaderboard/${gameId}`).then((res) => res.data);
 